@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Load test for the async chat path.
+
+Starts a local OpenAI stand-in with a fixed latency, points the app at it and
+fires concurrent /chat requests at a single in-process worker while probing
+/ping, to show that chats overlap and health checks stay responsive.
+
+    python benchmarks/chat_load_test.py --requests 200 --concurrency 100 --latency 0.5
+"""
+import os
+import sys
+import time
+import json
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import start_stub  # noqa: E402
+
+
+async def run(args):
+    process, port = start_stub("openai", args.latency, 0.0, seed=0)
+
+    os.environ["OPENAI_API_KEY"] = "sk-local-load-test"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    # Every simulated client shares one address
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    import logging
+    logging.disable(logging.INFO)
+    import httpx
+    from main import app
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    ping_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(app=app, base_url="http://app", timeout=60) as http:
+        async def one_chat(i):
+            async with semaphore:
+                r = await http.post("/chat", json={"message": f"load test {i}", "user_id": f"u{i}"})
+                return r.status_code == 200 and r.json().get("status") == "success"
+
+        async def probe_ping():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await http.get("/ping")
+                ping_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe_ping())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one_chat(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as stub:
+            state = (await stub.get("/stats")).json()
+    finally:
+        process.terminate()
+
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "upstream_latency_s": args.latency,
+        "ok": sum(results),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "peak_upstream_in_flight": state["peak"],
+        "serial_time_would_be_s": round(args.requests * args.latency, 1),
+        "max_ping_latency_ms": round(max(ping_latencies) * 1000, 1) if ping_latencies else None,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent chat load test against a local OpenAI stand-in")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    asyncio.run(run(parser.parse_args()))
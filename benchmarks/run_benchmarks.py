@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the MORVO backend.
+
+Runs the app in-process against local OpenAI and PostgREST stand-ins (each in
+its own process) with configurable latency and jitter. Each scenario (chat,
+data, search, all-data) is driven at a fixed concurrency. The report covers
+throughput, p50/p95/p99 latency, error counts and event-loop lag. Results are
+written as JSON so two runs can be compared:
+
+    python benchmarks/run_benchmarks.py --requests 500 --concurrency 50
+    python benchmarks/run_benchmarks.py --scenarios chat,search --compare benchmarks/results/<previous>.json
+
+The load generator shares the event loop with the app, so absolute numbers
+include client overhead; compare runs made with the same arguments on the
+same machine.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import VOCABULARY, start_stub  # noqa: E402
+
+SCENARIOS = ("chat", "data", "search", "all-data")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1] if values else None),
+        "mean_ms": ms(sum(values) / len(values) if values else None),
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires, i.e. how long the loop was blocked"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.expected = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - self.expected))
+
+    def start(self):
+        self.lags = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        # A loop that never yielded during the run still owes the pending tick
+        overdue = asyncio.get_running_loop().time() - self.expected
+        if overdue > 0:
+            self.lags.append(overdue)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return summarize(self.lags)
+
+
+def scenario_requests(name: str, rng: random.Random) -> Callable[[int], tuple]:
+    """(method, path, json body) for the i-th request of a scenario"""
+    if name == "chat":
+        # Distinct prompts so the response cache does not short-circuit the pipeline
+        return lambda i: ("POST", "/chat", {"message": f"benchmark question {i}: {rng.choice(VOCABULARY)}", "user_id": f"user-{i % 50}"})
+    if name == "data":
+        paths = ("/api/seo-signals", "/api/mentions", "/api/posts")
+        return lambda i: ("GET", f"{paths[i % 3]}?limit=20&offset={rng.randint(0, 200)}", None)
+    if name == "search":
+        return lambda i: ("POST", "/api/search", {"query": " ".join(rng.sample(VOCABULARY, 2)), "limit": 10})
+    if name == "all-data":
+        return lambda i: ("GET", "/api/all-data?limit=5", None)
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def run_scenario(http, name: str, requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    make_request = scenario_requests(name, random.Random(seed))
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(requests))
+    monitor = LoopLagMonitor()
+
+    async def worker():
+        for i in counter:
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, path, json=body)
+                ok = response.status_code < 400 and (
+                    not response.headers.get("content-type", "").startswith("application/json")
+                    or response.json().get("status") != "error"
+                )
+                key = None if ok else f"http_{response.status_code}"
+            except Exception as e:
+                key = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if key:
+                errors[key] = errors.get(key, 0) + 1
+
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    loop_lag = await monitor.stop()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors.values()),
+        "error_kinds": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else None,
+        "latency": summarize(latencies),
+        "event_loop_lag": loop_lag,
+    }
+
+
+def upstream_calls(upstream: str) -> int:
+    """Upstream requests made by the app, read from its own metrics"""
+    from morvo_python.app.metrics import openai_requests, supabase_queries
+    metric = openai_requests if upstream == "openai" else supabase_queries
+    return int(sum(value for _, _, value in metric.samples()))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Any]:
+    """Relative change of throughput and tail latency per scenario (positive = more)"""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if new is not None and old else None
+
+    diff = {}
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        diff[name] = {
+            "throughput_rps_pct": change(result["throughput_rps"], previous["throughput_rps"]),
+            "p50_ms_pct": change(result["latency"]["p50_ms"], previous["latency"]["p50_ms"]),
+            "p99_ms_pct": change(result["latency"]["p99_ms"], previous["latency"]["p99_ms"]),
+            "loop_lag_p99_ms_pct": change(result["event_loop_lag"]["p99_ms"], previous["event_loop_lag"]["p99_ms"]),
+        }
+    return diff
+
+
+async def run(args) -> Dict[str, Any]:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name}; choose from {', '.join(SCENARIOS)}")
+
+    openai_process, openai_port = start_stub("openai", args.openai_latency, args.openai_jitter, args.seed)
+    rest_process, rest_port = start_stub("postgrest", args.rest_latency, args.rest_jitter, args.seed, args.rows)
+
+    # The app reads its configuration at import time
+    os.environ["OPENAI_API_KEY"] = "sk-local-benchmark"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{openai_port}/v1"
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{rest_port}"
+    os.environ["SUPABASE_KEY"] = "local-benchmark"
+    os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+    # Every simulated client shares one address
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if args.no_cache:
+        os.environ["CHAT_CACHE_ENABLED"] = "false"
+        os.environ["SUPABASE_CACHE_ENABLED"] = "false"
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from main import app
+    from morvo_python.app.row_feed import row_feed
+
+    await app.router.startup()
+    try:
+        if "search" in scenarios:
+            # Let the row feed load the index so search measures the in-memory path
+            try:
+                await asyncio.wait_for(row_feed.synced.wait(), timeout=60)
+            except asyncio.TimeoutError:
+                print("warning: row feed did not sync; search falls back to PostgREST", file=sys.stderr)
+
+        results = {}
+        async with httpx.AsyncClient(app=app, base_url="http://app", timeout=120) as http:
+            for name in scenarios:
+                if args.warmup:
+                    await run_scenario(http, name, args.warmup, min(args.concurrency, args.warmup), args.seed + 1)
+                results[name] = await run_scenario(http, name, args.requests, args.concurrency, args.seed)
+                print(f"{name}: {results[name]['throughput_rps']} req/s, p99 {results[name]['latency']['p99_ms']} ms",
+                      file=sys.stderr)
+    finally:
+        await app.router.shutdown()
+        for process in (openai_process, rest_process):
+            process.terminate()
+            process.join()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            key: getattr(args, key) for key in (
+                "requests", "concurrency", "warmup", "rows", "seed", "no_cache",
+                "openai_latency", "openai_jitter", "rest_latency", "rest_jitter",
+            )
+        },
+        "upstream_calls": {
+            "openai": upstream_calls("openai"),
+            "postgrest": upstream_calls("supabase"),
+        },
+        "scenarios": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = {"baseline": args.compare, "changes": compare(report, json.load(f))}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MORVO backend against local upstream stand-ins")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests before each scenario")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per table in the PostgREST stand-in")
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--openai-jitter", type=float, default=0.1)
+    parser.add_argument("--rest-latency", type=float, default=0.02)
+    parser.add_argument("--rest-jitter", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the chat and table read caches")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>-<revision>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['git_revision'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Worker scaling benchmark for the MORVO backend.
+
+Starts the real multi-process server (python -m morvo_python.app.server) once
+per worker count against the local OpenAI and PostgREST stand-ins, drives it
+over HTTP from several client processes for a fixed duration, and reports
+throughput and latency per worker count along with the speedup over one
+worker:
+
+    python benchmarks/run_scaling.py --workers 1,2,4 --scenarios data,chat --duration 15
+
+Scaling is bounded by the cores available to the server and the clients
+together; the report records the core count so runs on different machines
+are not compared by mistake.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import free_port, start_stub  # noqa: E402
+from run_benchmarks import RESULTS_DIR, git_revision, scenario_requests, summarize  # noqa: E402
+
+SCALING_SCENARIOS = ("chat", "data", "all-data")
+
+
+def _drive(job: Dict[str, Any]) -> Dict[str, Any]:
+    """One client process: `concurrency` connections issuing requests until the deadline"""
+    import httpx
+
+    async def run():
+        make_request = scenario_requests(job["scenario"], random.Random(job["seed"]))
+        latencies: List[float] = []
+        errors = 0
+        deadline = time.monotonic() + job["duration"]
+        counter = iter(range(job["offset"], 10 ** 9, job["stride"]))
+        limits = httpx.Limits(max_connections=job["concurrency"], max_keepalive_connections=job["concurrency"])
+        async with httpx.AsyncClient(base_url=job["base_url"], timeout=60, limits=limits) as http:
+            async def worker():
+                nonlocal errors
+                for i in counter:
+                    if time.monotonic() >= deadline:
+                        return
+                    method, path, body = make_request(i)
+                    started = time.perf_counter()
+                    try:
+                        response = await http.request(method, path, json=body)
+                        if response.status_code >= 400:
+                            errors += 1
+                    except Exception:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(worker() for _ in range(job["concurrency"])))
+        return {"latencies": latencies, "errors": errors}
+
+    return asyncio.run(run())
+
+
+def wait_until_healthy(base_url: str, timeout: float = 60.0):
+    import httpx
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except Exception:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy")
+
+
+def start_server(workers: int, env: Dict[str, str]) -> tuple:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "morvo_python.app.server"],
+        cwd=ROOT,
+        env=dict(env, PORT=str(port), WEB_CONCURRENCY=str(workers)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_healthy(base_url)
+    except Exception:
+        process.kill()
+        raise
+    return process, base_url
+
+
+def measure(base_url: str, scenario: str, args) -> Dict[str, Any]:
+    per_client = max(1, args.concurrency // args.clients)
+    jobs = [
+        {
+            "base_url": base_url, "scenario": scenario, "duration": args.duration,
+            "concurrency": per_client, "seed": args.seed + n, "offset": n, "stride": args.clients,
+        }
+        for n in range(args.clients)
+    ]
+    with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+        if args.warmup:
+            pool.map(_drive, [dict(job, duration=args.warmup) for job in jobs])
+        started = time.perf_counter()
+        results = pool.map(_drive, jobs)
+        elapsed = time.perf_counter() - started
+    latencies = [value for result in results for value in result["latencies"]]
+    return {
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency": summarize(latencies),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    worker_counts = [int(n) for n in args.workers.split(",") if n.strip()]
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in scenarios:
+        if name not in SCALING_SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name}; choose from {', '.join(SCALING_SCENARIOS)}")
+
+    openai_process, openai_port = start_stub("openai", args.openai_latency, args.openai_jitter, args.seed)
+    rest_process, rest_port = start_stub("postgrest", args.rest_latency, args.rest_jitter, args.seed, args.rows)
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="sk-local-benchmark",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{openai_port}/v1",
+        SUPABASE_URL=f"http://127.0.0.1:{rest_port}",
+        SUPABASE_KEY="local-benchmark",
+        ROW_FEED_ENABLED="false",
+        RATE_LIMIT_ENABLED="false",
+    )
+    env.setdefault("ACCESS_LOG_ENABLED", "false")
+
+    results: Dict[str, Dict[str, Any]] = {name: {} for name in scenarios}
+    try:
+        for workers in worker_counts:
+            server, base_url = start_server(workers, env)
+            try:
+                for name in scenarios:
+                    result = measure(base_url, name, args)
+                    results[name][str(workers)] = result
+                    print(f"{name} x{workers} workers: {result['throughput_rps']} req/s, "
+                          f"p99 {result['latency']['p99_ms']} ms", file=sys.stderr)
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+    finally:
+        for process in (openai_process, rest_process):
+            process.terminate()
+            process.join()
+
+    for name, by_workers in results.items():
+        base = by_workers.get(str(worker_counts[0]), {}).get("throughput_rps")
+        for workers, result in by_workers.items():
+            result["speedup"] = round(result["throughput_rps"] / base, 2) if base else None
+            result["efficiency"] = round(result["speedup"] * worker_counts[0] / int(workers), 2) if base else None
+
+    from morvo_python.app.server import available_cpus
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "available_cpus": available_cpus(),
+        "config": {
+            key: getattr(args, key) for key in (
+                "workers", "concurrency", "clients", "duration", "warmup", "rows", "seed",
+                "openai_latency", "openai_jitter", "rest_latency", "rest_jitter",
+            )
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MORVO backend throughput by worker count")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--scenarios", default="data,chat", help="Comma-separated: " + ", ".join(SCALING_SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=64, help="Open connections across all clients")
+    parser.add_argument("--clients", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--duration", type=float, default=15, help="Measured seconds per worker count and scenario")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each measurement")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per table in the PostgREST stand-in")
+    parser.add_argument("--openai-latency", type=float, default=0.3)
+    parser.add_argument("--openai-jitter", type=float, default=0.1)
+    parser.add_argument("--rest-latency", type=float, default=0.02)
+    parser.add_argument("--rest-jitter", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/scaling-<timestamp>-<revision>.json)")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"scaling-{stamp}-{report['git_revision'] or 'local'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Local stand-ins for the OpenAI and PostgREST upstreams used by the benchmarks.
+
+Both add a configurable latency with uniform jitter to every call. Randomness is
+seeded, so a given set of arguments produces the same data and delays. Each
+stand-in runs in its own process so it does not compete with the app under
+test for the event loop.
+"""
+import re
+import json
+import time
+import random
+import socket
+import asyncio
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+VOCABULARY = (
+    "marketing roi campaign brand seo ranking growth customer retention funnel "
+    "content social engagement budget conversion launch review loyalty audience "
+    "تسويق علامة حملة عملاء محتوى"
+).split()
+PLATFORMS = ("twitter", "instagram", "linkedin", "tiktok")
+SOURCES = ("news", "blog", "forum", "twitter")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Delay:
+    """Latency of latency ± jitter seconds, uniform and never negative"""
+
+    def __init__(self, latency: float, jitter: float, rng: random.Random):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng
+
+    async def __call__(self):
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter) if self.jitter else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def generate_tables(rows_per_table: int, seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Synthetic seo_signals, mentions and posts with strictly increasing (created_at, id)"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def words(n: int) -> str:
+        return " ".join(rng.choice(VOCABULARY) for _ in range(n))
+
+    tables = {"seo_signals": [], "mentions": [], "posts": []}
+    for i in range(rows_per_table):
+        created_at = (start + timedelta(seconds=i * 60)).isoformat()
+        tables["seo_signals"].append({
+            "id": i + 1, "created_at": created_at, "keyword": words(2),
+            "position": rng.randint(1, 100), "change": rng.randint(-10, 10),
+            "volume": rng.randint(10, 50000), "url": f"https://example.com/{i}",
+        })
+        tables["mentions"].append({
+            "id": i + 1, "created_at": created_at, "text": words(12),
+            "sentiment": round(rng.uniform(-1, 1), 3), "source": rng.choice(SOURCES),
+            "reach": rng.randint(0, 100000),
+        })
+        tables["posts"].append({
+            "id": i + 1, "created_at": created_at, "content": words(15),
+            "platform": rng.choice(PLATFORMS), "likes": rng.randint(0, 5000),
+            "shares": rng.randint(0, 1000), "comments": rng.randint(0, 500),
+            "reach": rng.randint(100, 200000),
+        })
+    return tables
+
+
+def build_openai_stub(delay: Delay, state: Dict[str, int]):
+    """/v1/chat/completions stand-in, streaming and non-streaming; GET /stats reports calls and peak concurrency"""
+    from fastapi import FastAPI, Request, Response
+    from fastapi.responses import StreamingResponse
+
+    stub = FastAPI()
+    answer = "This is a benchmark answer from the local OpenAI stand-in."
+
+    @stub.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await delay()
+        finally:
+            state["in_flight"] -= 1
+        model = body.get("model", "gpt-3.5-turbo")
+        if body.get("stream"):
+            async def events():
+                for word in answer.split(" "):
+                    chunk = {
+                        "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return Response(json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 12, "total_tokens": 132},
+        }), media_type="application/json")
+
+    @stub.get("/stats")
+    async def stats():
+        return dict(state)
+
+    return stub
+
+
+_KEYSET = re.compile(r'id\.(gt|lt)\."?(\d+)"?')
+_ILIKE = re.compile(r"(\w+)\.ilike\.\*([^*]*)\*")
+
+
+def build_postgrest_stub(tables: Dict[str, List[Dict[str, Any]]], delay: Delay, state: Dict[str, int]):
+    """The subset of PostgREST the app uses: select, order, limit/offset, keyset and ilike filters, and inserts"""
+    from fastapi import FastAPI, Request, Response
+
+    stub = FastAPI()
+
+    @stub.get("/rest/v1/{table}")
+    async def select(table: str, request: Request):
+        state["calls"] += 1
+        await delay()
+        rows = tables.get(table)
+        if rows is None:
+            return Response(status_code=404)
+        params = request.query_params
+        descending = params.get("order", "").startswith("created_at.desc")
+        condition = params.get("or", "")
+        keyset = _KEYSET.search(condition)
+        terms = _ILIKE.findall(condition)
+        if terms:
+            rows = [row for row in rows if any(term.lower() in str(row.get(field, "")).lower() for field, term in terms)]
+        if keyset:
+            op, value = keyset.group(1), int(keyset.group(2))
+            rows = [row for row in rows if (row["id"] > value if op == "gt" else row["id"] < value)]
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        if descending:
+            end = len(rows) - offset
+            page = rows[max(0, end - limit):max(0, end)][::-1]
+        else:
+            page = rows[offset:offset + limit]
+        select_columns = params.get("select", "*")
+        if select_columns != "*":
+            columns = select_columns.split(",")
+            page = [{column: row.get(column) for column in columns} for row in page]
+        # Serialized directly; FastAPI's response encoding would make the stand-in the bottleneck
+        return Response(json.dumps(page), media_type="application/json")
+
+    @stub.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        state["calls"] += 1
+        await delay()
+        if table not in tables:
+            return Response(status_code=404)
+        body = await request.json()
+        inserted = []
+        for row in body if isinstance(body, list) else [body]:
+            row = dict(row, id=len(tables[table]) + 1)
+            row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+            tables[table].append(row)
+            inserted.append(row)
+        if "return=representation" in request.headers.get("prefer", ""):
+            return Response(json.dumps(inserted), status_code=201, media_type="application/json")
+        return Response(status_code=201)
+
+    return stub
+
+
+def _serve_stub(kind: str, port: int, latency: float, jitter: float, seed: int, rows: int):
+    import uvicorn
+
+    rng = random.Random(seed)
+    delay = Delay(latency, jitter, rng)
+    if kind == "openai":
+        app = build_openai_stub(delay, {"calls": 0, "in_flight": 0, "peak": 0})
+    else:
+        app = build_postgrest_stub(generate_tables(rows, seed), delay, {"calls": 0})
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def start_stub(kind: str, latency: float, jitter: float, seed: int, rows: int = 0, timeout: float = 30.0):
+    """Run the "openai" or "postgrest" stand-in in a child process; returns (process, port)"""
+    port = free_port()
+    process = multiprocessing.Process(
+        target=_serve_stub, args=(kind, port, latency, jitter, seed, rows), daemon=True
+    )
+    process.start()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"{kind} stand-in did not start on port {port}")
@@ -1,11 +1,43 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import os
+import hmac
 import logging
 import traceback
-import openai
 import json
+import asyncio
+from typing import Optional
+from pydantic import ValidationError
+from morvo_python.app.openai_client import (
+    get_async_openai_client,
+    create_chat_completion,
+    stream_chat_completion,
+    close_openai_client,
+    get_completion_stats,
+)
+from morvo_python.app.response_cache import chat_cache, make_chat_cache_key
+from morvo_python.app.coalescing import chat_requests, chat_streams
+from morvo_python.app.conversation_store import conversation_store, estimate_tokens
+from morvo_python.app.insights import data_insights
+from morvo_python.app.model_router import Route, model_router
+from morvo_python.app.models import (
+    CacheInvalidation, ChatBatchItem, ChatBatchRequest, ChatMessage, ChatResponse, DashboardData, IngestResult,
+    SearchRequest, SearchResponse, TablePage,
+)
+from morvo_python.app.serialization import (
+    BodySizeLimitMiddleware, FastJSONResponse, json_response, model_response, utc_now, utc_timestamp,
+)
+from morvo_python.app.request_logging import AccessLogMiddleware, access_log_writer, redact_message
+from morvo_python.app.metrics import MetricsMiddleware, registry as metrics_registry
+from morvo_python.app.tracing import TracingMiddleware, span, span_exporter
+from morvo_python.app.server import drain_state
+from morvo_python.app.resilience import CircuitOpenError, resilience_stats
+from morvo_python.app.rate_limit import (
+    charge_tokens, check_chat_limits, check_more_chat_limits, check_token_budget, client_ip, rate_limit_stats,
+    retry_after_header,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -17,23 +49,19 @@ logger = logging.getLogger(__name__)
 # Environment variables
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 RAILWAY_ENVIRONMENT = os.getenv("RAILWAY_ENVIRONMENT", "development")
+# Batch chat: items per request, and how many run at once by default and at most
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "200"))
+CHAT_BATCH_PARALLELISM = int(os.getenv("CHAT_BATCH_PARALLELISM", "8"))
+CHAT_BATCH_MAX_PARALLELISM = int(os.getenv("CHAT_BATCH_MAX_PARALLELISM", "32"))
 
-       # Configure OpenAI client
+# Configure async OpenAI client (shared connection pool, bounded concurrency)
 if OPENAI_API_KEY:
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-    logger.info("OpenAI client configured")
+    logger.info("OpenAI async completion engine configured")
 else:
     logger.warning("OpenAI API key not found - AI features will be disabled")
-    client = None
-
-async def get_openai_response(message: str, user_id: str = "anonymous") -> str:
-    """Get AI response from OpenAI"""
-    try:
-        if not client:
-            return "I'm sorry, but I'm currently experiencing technical difficulties. Please try again later."
 
-        # Create a MORVO-specific system message
-        system_message = """You are MORVO, an ROI Marketing Strategist and AI Consultant. You specialize in:
+# MORVO-specific system message
+MORVO_SYSTEM_MESSAGE = """You are MORVO, an ROI Marketing Strategist and AI Consultant. You specialize in:
         - Marketing strategy and ROI optimization
         - Digital marketing campaigns
         - Customer acquisition and retention
@@ -43,30 +71,302 @@ async def get_openai_response(message: str, user_id: str = "anonymous") -> str:
         Always respond in a professional, helpful manner. If the user asks in Arabic, respond in Arabic.
         If they ask in English, respond in English. Provide actionable, practical advice."""
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": message}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+def build_chat_messages(message: str, history: list = None, insights: str = "") -> list:
+    """Assemble the prompt sent to OpenAI"""
+    messages = [{"role": "system", "content": MORVO_SYSTEM_MESSAGE}]
+    if insights:
+        messages.append({"role": "system", "content": f"Latest marketing data for this user:\n{insights}"})
+    return [
+        *messages,
+        *(history or []),
+        {"role": "user", "content": message}
+    ]
+
+def charge_completion(messages: list, response_text: str, usage=None):
+    """Charge an upstream completion to the caller's daily token budget"""
+    if usage is not None:
+        charge_tokens(usage.total_tokens)
+    else:
+        charge_tokens(sum(estimate_tokens(m["content"]) for m in messages) + estimate_tokens(response_text))
+
+async def enforce_chat_limits(request: Request):
+    """Reject over-limit callers with 429 before any chat work is done"""
+    try:
+        body = await request.json()
+    except ValueError:
+        body = {}
+    user_id = body.get("user_id") if isinstance(body, dict) else None
+    rejected = await check_chat_limits(user_id, client_ip(request.headers, request.client))
+    if rejected is not None:
+        reason, retry_after = rejected
+        raise HTTPException(status_code=429, detail=reason, headers={"Retry-After": retry_after_header(retry_after)})
+
+def remember_turn(user_id: str, session_id: str, message: str, response_text: str):
+    """Record a completed exchange in the session's conversation memory"""
+    if session_id and response_text:
+        conversation_store.append(user_id, session_id, "user", message)
+        conversation_store.append(user_id, session_id, "assistant", response_text)
 
-        return response.choices[0].message.content.strip()
+async def complete_routed(messages: list, route: Route):
+    """Run one completion on the routed model, falling back along its chain; returns (response, model)"""
+    return await model_router.complete(route, lambda model, deadline: create_chat_completion(
+        model=model,
+        messages=messages,
+        max_tokens=route.max_tokens,
+        temperature=route.temperature,
+        deadline=deadline
+    ))
+
+def stream_routed(messages: list, route: Route):
+    """Stream one completion from the routed model, falling back until a model starts answering"""
+    return model_router.stream(route, lambda model, deadline: stream_chat_completion(
+        model=model,
+        messages=messages,
+        max_tokens=route.max_tokens,
+        temperature=route.temperature,
+        deadline=deadline
+    ))
+
+async def complete_and_cache(messages: list, cache_key: str, route: Route) -> str:
+    """Run one upstream completion and store the answer in the response cache"""
+    response, model = await complete_routed(messages, route)
+
+    response_text = response.choices[0].message.content.strip()
+    # Answers from a fallback model are served but not cached in place of the primary model's
+    if model == route.model:
+        await chat_cache.set(cache_key, response_text)
+    return response_text
+
+async def stream_and_cache(messages: list, cache_key: str, route: Route):
+    """Stream one upstream completion and cache the full answer once it finishes"""
+    tokens = []
+    async for token in stream_routed(messages, route):
+        tokens.append(token)
+        yield token
+    # As in complete_and_cache, answers from a fallback model are not cached
+    if route.served_model == route.model:
+        await chat_cache.set(cache_key, "".join(tokens).strip())
+
+async def generate_chat_response(
+    message: str, user_id: str = "anonymous", session_id: str = None, latency_budget: float = None
+) -> str:
+    """Answer one chat message through the cache, coalescing and model routing; raises on failure"""
+    if not get_async_openai_client():
+        raise RuntimeError("OpenAI client is not configured")
+
+    with span("chat.build_prompt") as current:
+        insights, _ = data_insights.get(user_id)
+        history = await conversation_store.get_context(user_id, session_id) if session_id else []
+        current.set_attribute("chat.history_messages", len(history))
+        route = model_router.route(message, latency_budget)
+        current.set_attribute("chat.prompt_class", route.prompt_class)
+    if history:
+        # Follow-up turns depend on the session, so they bypass the shared cache
+        response, _ = await complete_routed(build_chat_messages(message, history, insights), route)
+        response_text = response.choices[0].message.content.strip()
+        charge_completion([], response_text, response.usage)
+    else:
+        with span("chat.cache_lookup") as current:
+            cache_key = make_chat_cache_key(message, route.model, MORVO_SYSTEM_MESSAGE + insights)
+            response_text = await chat_cache.get(cache_key)
+            current.set_attribute("cache.hit", response_text is not None)
+        if response_text is None:
+            # Identical prompts already in flight share one upstream completion
+            messages = build_chat_messages(message, insights=insights)
+            response_text = await chat_requests.do(cache_key, lambda: complete_and_cache(messages, cache_key, route))
+            charge_completion(messages, response_text)
+
+    remember_turn(user_id, session_id, message, response_text)
+    return response_text
+
+async def get_openai_response(
+    message: str, user_id: str = "anonymous", session_id: str = None, latency_budget: float = None
+) -> str:
+    """Get AI response from OpenAI"""
+    try:
+        if not get_async_openai_client():
+            return "I'm sorry, but I'm currently experiencing technical difficulties. Please try again later."
+
+        return await generate_chat_response(message, user_id, session_id, latency_budget)
 
     except Exception as e:
         logger.error(f"OpenAI API error: {e}")
         return f"I'm sorry, but I encountered an error while processing your request. Please try again later. (Error: {str(e)})"
 
+async def stream_openai_response(
+    message: str, user_id: str = "anonymous", session_id: str = None, latency_budget: float = None
+):
+    """Stream AI response tokens from OpenAI as they are generated"""
+    if not get_async_openai_client():
+        yield "I'm sorry, but I'm currently experiencing technical difficulties. Please try again later."
+        return
+
+    insights, _ = data_insights.get(user_id)
+    history = await conversation_store.get_context(user_id, session_id) if session_id else []
+    route = model_router.route(message, latency_budget)
+    if history:
+        messages = build_chat_messages(message, history, insights)
+        tokens = stream_routed(messages, route)
+    else:
+        cache_key = make_chat_cache_key(message, route.model, MORVO_SYSTEM_MESSAGE + insights)
+        cached = await chat_cache.get(cache_key)
+        if cached is not None:
+            remember_turn(user_id, session_id, message, cached)
+            yield cached
+            return
+        # Concurrent identical prompts subscribe to the same upstream token stream
+        messages = build_chat_messages(message, insights=insights)
+        tokens = chat_streams.subscribe(cache_key, lambda: stream_and_cache(messages, cache_key, route))
+
+    received = []
+    try:
+        async for token in tokens:
+            received.append(token)
+            yield token
+    finally:
+        # Partial answers were still generated upstream, so they count too
+        charge_completion(messages, "".join(received))
+    remember_turn(user_id, session_id, message, "".join(received).strip())
+
+async def parse_chat_body(request: Request) -> ChatMessage:
+    """Validate a chat body inside its own span; failures are the usual 422"""
+    with span("chat.parse_body"):
+        try:
+            return ChatMessage.model_validate_json(await request.body() or b"{}")
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+
+# parse_chat_body reads the raw request, so routes that use it document the body themselves
+CHAT_BODY_OPENAPI = {
+    "requestBody": {"content": {"application/json": {"schema": ChatMessage.model_json_schema()}}, "required": True}
+}
+
+def wants_stream(request: Request, body: ChatMessage) -> bool:
+    """Stream when the client sends stream: true or accepts text/event-stream"""
+    if body.stream is True:
+        return True
+    return "text/event-stream" in request.headers.get("accept", "")
+
+def ndjson_line(data: dict) -> str:
+    """Format one newline-delimited JSON record"""
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format a single server-sent event"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+def sse_chat_response(
+    query: str, user_id: str, meta: dict, session_id: str = None, latency_budget: float = None
+) -> StreamingResponse:
+    """Stream a chat completion as server-sent events.
+
+    Starlette cancels the generator when the client disconnects, which closes
+    the upstream OpenAI stream so abandoned generations stop being billed.
+    """
+    async def events():
+        drain_state.stream_started()
+        try:
+            async for token in stream_openai_response(query, user_id, session_id, latency_budget):
+                yield sse_event({"token": token})
+            yield sse_event({
+                **meta,
+                "status": "success",
+                "data_insights": data_insights.get(user_id)[1],
+                "timestamp": utc_timestamp()
+            }, event="done")
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield sse_event({"status": "error", "error": str(e)}, event="error")
+        finally:
+            drain_state.stream_finished()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def answer_batch_item(index: int, item: ChatBatchItem, batch: ChatBatchRequest) -> dict:
+    """One batch result record; failures are reported on the item instead of ending the batch"""
+    result = {"index": index}
+    if item.id is not None:
+        result["id"] = item.id
+    if index:
+        # The request's own limit check paid for the first item; every further item is charged like a chat call
+        rejected = await check_more_chat_limits()
+    else:
+        retry_after = check_token_budget()
+        rejected = ("Daily token budget exhausted", retry_after) if retry_after is not None else None
+    if rejected is not None:
+        reason, retry_after = rejected
+        return {**result, "status": "error", "error": reason, "retry_after": retry_after_header(retry_after)}
+    try:
+        response_text = await generate_chat_response(
+            item.message, batch.user_id, item.session_id, item.latency_budget or batch.latency_budget
+        )
+        return {**result, "status": "success", "response": response_text, "timestamp": utc_timestamp()}
+    except Exception as e:
+        logger.error(f"Batch chat item {index} error: {e}")
+        return {**result, "status": "error", "error": str(e)}
+
+def batch_chat_response(batch: ChatBatchRequest, parallelism: int) -> StreamingResponse:
+    """Answer batch items concurrently, streaming one NDJSON line per item in completion order.
+
+    A final summary line without an index marks the end of the batch.
+    Disconnecting cancels the items still queued or running.
+    """
+    async def records():
+        drain_state.stream_started()
+        started = asyncio.get_running_loop().time()
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def run(index: int, item: ChatBatchItem) -> dict:
+            async with semaphore:
+                return await answer_batch_item(index, item, batch)
+
+        tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(batch.items)]
+        succeeded = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                succeeded += result["status"] == "success"
+                yield ndjson_line(result)
+            yield ndjson_line({
+                "status": "complete",
+                "count": len(tasks),
+                "succeeded": succeeded,
+                "failed": len(tasks) - succeeded,
+                "parallelism": parallelism,
+                "elapsed_seconds": round(asyncio.get_running_loop().time() - started, 3),
+                "timestamp": utc_timestamp()
+            })
+        finally:
+            for task in tasks:
+                task.cancel()
+            drain_state.stream_finished()
+
+    return StreamingResponse(
+        records(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Create FastAPI app with error handling
 try:
-    app = FastAPI(title="MORVO Backend", version="1.0.0")
+    app = FastAPI(title="MORVO Backend", version="1.0.0", default_response_class=FastJSONResponse)
     logger.info("FastAPI app created successfully")
 except Exception as e:
     logger.error(f"Failed to create FastAPI app: {e}")
     raise
 
+# Oversized bodies are refused before they are read; CORS is added after so 413s still carry its headers
+app.add_middleware(BodySizeLimitMiddleware)
+
 # Add CORS middleware with specific origins
 try:
     app.add_middleware(
@@ -94,22 +394,39 @@ try:
 except Exception as e:
     logger.error(f"Failed to add CORS middleware: {e}")
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests for debugging"""
-    logger.info(f"Incoming request: {request.method} {request.url}")
-    logger.info(f"Origin: {request.headers.get('origin', 'No origin')}")
-    logger.info(f"User-Agent: {request.headers.get('user-agent', 'No user-agent')}")
-    
-    response = await call_next(request)
-    
-    logger.info(f"Response status: {response.status_code}")
-    return response
+# One structured JSON access log line per request, written off the event loop
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
+def collect_runtime_metrics():
+    """In-flight upstream calls and cache hit ratios, read at scrape time"""
+    from morvo_python.app.supabase_client import get_rest_stats, table_cache
+    caches = {"chat": chat_cache.stats(), "table": table_cache.stats()}
+    return [
+        ("morvo_upstream_in_flight", "gauge", "Upstream requests currently in flight", [
+            ("morvo_upstream_in_flight", {"upstream": "openai"}, get_completion_stats()["in_flight"]),
+            ("morvo_upstream_in_flight", {"upstream": "supabase"}, get_rest_stats()["in_flight"]),
+        ]),
+        ("morvo_cache_hits_total", "counter", "Cache lookups served from cache", [
+            ("morvo_cache_hits_total", {"cache": name}, stats["hits"]) for name, stats in caches.items()
+        ]),
+        ("morvo_cache_misses_total", "counter", "Cache lookups that missed", [
+            ("morvo_cache_misses_total", {"cache": name}, stats["misses"]) for name, stats in caches.items()
+        ]),
+        ("morvo_cache_hit_ratio", "gauge", "Cache hit ratio since startup", [
+            ("morvo_cache_hit_ratio", {"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()
+        ]),
+    ]
+
+metrics_registry.register_collector(collect_runtime_metrics)
 
 @app.on_event("startup")
 async def startup_event():
     """Startup event handler with comprehensive logging"""
     try:
+        access_log_writer.start()
+        span_exporter.start()
         logger.info("=== MORVO Backend Starting Up ===")
         logger.info(f"Python version: {os.sys.version}")
         logger.info(f"Working directory: {os.getcwd()}")
@@ -143,6 +460,33 @@ async def startup_event():
         logger.error(f"Startup error: {e}")
         logger.error(traceback.format_exc())
 
+@app.on_event("startup")
+async def start_row_feed():
+    """Keep the search index, chat insights, dashboard aggregates and alerts in sync with new table rows"""
+    try:
+        from morvo_python.app.row_feed import row_feed
+        from morvo_python.app.search_index import search_index
+        from morvo_python.app.aggregates import dashboard_aggregates
+        from morvo_python.app.alerts import alert_engine
+        row_feed.subscribe(search_index.add_rows)
+        row_feed.subscribe(data_insights.add_rows)
+        row_feed.subscribe(dashboard_aggregates.add_rows)
+        row_feed.subscribe(alert_engine.add_rows)
+        row_feed.start()
+    except Exception as e:
+        logger.error(f"Row feed startup error: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled upstream connections"""
+    from morvo_python.app.row_feed import row_feed
+    from morvo_python.app.supabase_client import close_rest_client
+    await row_feed.stop()
+    await close_openai_client()
+    await close_rest_client()
+    await span_exporter.stop()
+    access_log_writer.stop()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for debugging"""
@@ -162,37 +506,40 @@ def root():
         logger.error(f"Root endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/")
-async def root_chat(request: Request):
+@app.post(
+    "/", response_model=ChatResponse, dependencies=[Depends(enforce_chat_limits)], openapi_extra=CHAT_BODY_OPENAPI
+)
+async def root_chat(body: ChatMessage = Depends(parse_chat_body)):
     """Handle chat requests to root endpoint"""
     try:
-        body = await request.json()
-        query = body.get("message", "")
+        query = body.message
         
-        logger.info(f"Root chat query received: {query}")
+        logger.debug(f"Root chat query received: {redact_message(query)}")
         
-        response_text = await get_openai_response(query, "anonymous")
+        response_text = await get_openai_response(query, "anonymous", latency_budget=body.latency_budget)
         
-        return {
-            "response": response_text,
-            "status": "success",
-            "assistant": "MORVO",
-            "endpoint": "/",
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response=response_text,
+            status="success",
+            assistant="MORVO",
+            endpoint="/",
+            timestamp=utc_now()
+        ))
     except Exception as e:
         logger.error(f"Root chat endpoint error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "response": "I'm sorry, but I encountered an error processing your request. Please try again.",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response="I'm sorry, but I encountered an error processing your request. Please try again.",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
 
 @app.get("/health")
 def health():
     """Health check endpoint"""
+    if drain_state.draining:
+        return JSONResponse(status_code=503, content={"status": "draining"})
     try:
         return {"status": "healthy"}
     except Exception as e:
@@ -207,16 +554,40 @@ def ping():
 @app.get("/api-status")
 def api_status():
     """Check API key status"""
+    from morvo_python.app.ingest import ingest_stats
+    from morvo_python.app.row_feed import row_feed
+    from morvo_python.app.search_index import search_index
     return {
         "openai_configured": bool(OPENAI_API_KEY),
         "environment": RAILWAY_ENVIRONMENT,
+        "completion_engine": get_completion_stats(),
+        "chat_cache": chat_cache.stats(),
+        "conversations": conversation_store.stats(),
+        "row_feed": row_feed.stats(),
+        "search_index": search_index.stats(),
+        "data_insights": data_insights.stats(),
+        "ingest": ingest_stats.as_dict(),
+        "access_log": access_log_writer.stats(),
+        "tracing": span_exporter.stats(),
+        "rate_limits": rate_limit_stats(),
+        "server": drain_state.stats(),
+        "upstreams": resilience_stats(),
+        "model_routing": model_router.stats(),
+        "coalescing": {
+            "requests": chat_requests.stats(),
+            "streams": chat_streams.stats()
+        },
         "status": "ready"
     }
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of request, upstream and cache metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.options("/{path:path}")
 async def options_handler(request: Request):
     """Handle OPTIONS requests for CORS preflight"""
-    logger.info(f"OPTIONS request received for: {request.url}")
     return JSONResponse(
         content={"message": "CORS preflight handled"},
         headers={
@@ -290,6 +661,38 @@ def debug():
         logger.error(f"Debug endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def require_token(request: Request, env_name: str, header: str, name: str):
+    """Endpoints guarded by a shared secret are disabled (404) until env_name is set, then need it in header"""
+    token = os.getenv(env_name)
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get(header, "").encode(), token.encode()):
+        raise HTTPException(status_code=401, detail=f"Invalid {name} token")
+
+def require_admin(request: Request):
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set and sent as x-admin-token"""
+    require_token(request, "ADMIN_TOKEN", "x-admin-token", "admin")
+
+@app.get("/admin/profile")
+async def admin_profile(request: Request, seconds: float = 5.0, interval_ms: float = 5.0, format: str = "json"):
+    """Time-boxed sampling CPU profile of this worker's event loop thread"""
+    from morvo_python.app.profiling import profile_event_loop
+    require_admin(request)
+    try:
+        profile = await profile_event_loop(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "folded":
+        return PlainTextResponse(profile["folded"])
+    return {"status": "success", "pid": os.getpid(), **profile}
+
+@app.get("/admin/tasks")
+async def admin_tasks(request: Request, limit: int = 500):
+    """Dump every asyncio task in this worker with the stack it is waiting in"""
+    from morvo_python.app.profiling import dump_tasks
+    require_admin(request)
+    return {"status": "success", "pid": os.getpid(), **dump_tasks(limit)}
+
 @app.get("/api/endpoints")
 def list_endpoints():
     """List all available endpoints for debugging"""
@@ -310,6 +713,7 @@ def list_endpoints():
             "chat_endpoints": [
                 "/chat",
                 "/api/chat", 
+                "/api/chat/batch",
                 "/api/morvo/chat"
             ],
             "data_endpoints": [
@@ -319,224 +723,224 @@ def list_endpoints():
                 "/api/supabase-status",
                 "/api/all-data"
             ],
-            "timestamp": "2025-08-10T12:06:00Z"
+            "timestamp": utc_timestamp()
         }
     except Exception as e:
         logger.error(f"Endpoints list error: {e}")
         return {
             "status": "error",
             "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
+            "timestamp": utc_timestamp()
         }
 
-@app.post("/chat")
-async def chat_query(request: Request):
+@app.post(
+    "/chat", response_model=ChatResponse, dependencies=[Depends(enforce_chat_limits)], openapi_extra=CHAT_BODY_OPENAPI
+)
+async def chat_query(request: Request, body: ChatMessage = Depends(parse_chat_body)):
     """Handle chat queries from the frontend"""
     try:
-        # Get the request body
-        body = await request.json()
-        query = body.get("message", "")
-        user_id = body.get("user_id", "anonymous")
-        session_id = body.get("session_id", "default")
+        query = body.message
+        user_id = body.user_id
+        session_id = body.session_id or "default"
+        # Conversation memory is only kept for sessions the client names explicitly
+        memory_session = body.session_id
         
-        logger.info(f"Chat query received from {user_id}: {query}")
+        logger.debug(f"Chat query received from {user_id}: {redact_message(query)}")
+        
+        if wants_stream(request, body):
+            return sse_chat_response(
+                query, user_id, {"user_id": user_id, "session_id": session_id}, memory_session, body.latency_budget
+            )
         
         # Get AI response from OpenAI
-        response_text = await get_openai_response(query, user_id)
+        response_text = await get_openai_response(query, user_id, memory_session, body.latency_budget)
         
-        return {
-            "response": response_text,
-            "status": "success",
-            "user_id": user_id,
-            "session_id": session_id,
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        with span("chat.serialize"):
+            return model_response(ChatResponse(
+                response=response_text,
+                status="success",
+                user_id=user_id,
+                session_id=session_id,
+                data_insights=data_insights.get(user_id)[1],
+                timestamp=utc_now()
+            ))
     except Exception as e:
         logger.error(f"Chat endpoint error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "response": "I'm sorry, but I encountered an error processing your request. Please try again.",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response="I'm sorry, but I encountered an error processing your request. Please try again.",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
 
-@app.post("/api/chat")
-async def api_chat_query(request: Request):
+@app.post(
+    "/api/chat", response_model=ChatResponse, dependencies=[Depends(enforce_chat_limits)], openapi_extra=CHAT_BODY_OPENAPI
+)
+async def api_chat_query(body: ChatMessage = Depends(parse_chat_body)):
     """Alternative chat endpoint for API calls"""
     try:
-        body = await request.json()
-        query = body.get("message", "")
-        user_id = body.get("user_id", "anonymous")
+        query = body.message
+        user_id = body.user_id
         
-        logger.info(f"API chat query received from {user_id}: {query}")
+        logger.debug(f"API chat query received from {user_id}: {redact_message(query)}")
         
         # Get AI response from OpenAI
-        response_text = await get_openai_response(query, user_id)
+        response_text = await get_openai_response(query, user_id, body.session_id, body.latency_budget)
         
-        return {
-            "response": response_text,
-            "status": "success",
-            "user_id": user_id,
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response=response_text,
+            status="success",
+            user_id=user_id,
+            data_insights=data_insights.get(user_id)[1],
+            timestamp=utc_now()
+        ))
     except Exception as e:
         logger.error(f"API chat endpoint error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "response": "An error occurred while processing your request.",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response="An error occurred while processing your request.",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
+
+@app.post("/api/chat/batch", dependencies=[Depends(enforce_chat_limits)])
+async def api_chat_batch(body: ChatBatchRequest):
+    """Answer many chat messages in one call, streamed back as NDJSON as each one finishes"""
+    if not body.items:
+        raise HTTPException(status_code=422, detail="items must not be empty")
+    if len(body.items) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {CHAT_BATCH_MAX_ITEMS} items per batch")
+    parallelism = min(max(1, body.max_parallel or CHAT_BATCH_PARALLELISM), CHAT_BATCH_MAX_PARALLELISM)
+    logger.debug(f"Chat batch received from {body.user_id}: {len(body.items)} items, parallelism {parallelism}")
+    return batch_chat_response(body, parallelism)
 
 # Add a catch-all endpoint for any chat-related requests
-@app.post("/api/morvo/chat")
-async def morvo_chat(request: Request):
+@app.post(
+    "/api/morvo/chat", response_model=ChatResponse, dependencies=[Depends(enforce_chat_limits)], openapi_extra=CHAT_BODY_OPENAPI
+)
+async def morvo_chat(request: Request, body: ChatMessage = Depends(parse_chat_body)):
     """MORVO-specific chat endpoint"""
     try:
-        body = await request.json()
-        query = body.get("message", "")
-        user_id = body.get("user_id", "anonymous")
+        query = body.message
+        user_id = body.user_id
+        
+        logger.debug(f"MORVO chat query received from {user_id}: {redact_message(query)}")
         
-        logger.info(f"MORVO chat query received from {user_id}: {query}")
+        if wants_stream(request, body):
+            return sse_chat_response(
+                query, user_id, {"assistant": "MORVO", "user_id": user_id}, body.session_id, body.latency_budget
+            )
         
         # Get AI response from OpenAI
-        response_text = await get_openai_response(query, user_id)
+        response_text = await get_openai_response(query, user_id, body.session_id, body.latency_budget)
         
-        return {
-            "response": response_text,
-            "status": "success",
-            "assistant": "MORVO",
-            "user_id": user_id,
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response=response_text,
+            status="success",
+            assistant="MORVO",
+            user_id=user_id,
+            data_insights=data_insights.get(user_id)[1],
+            timestamp=utc_now()
+        ))
     except Exception as e:
         logger.error(f"MORVO chat endpoint error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "response": "I'm sorry, but I encountered an error processing your request. Please try again.",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
-
-# Add a catch-all chat endpoint that handles any POST request to /api/*
-@app.post("/api/{path:path}")
-async def catch_all_api(request: Request, path: str):
-    """Catch-all endpoint for any API calls"""
-    try:
-        logger.info(f"Catch-all API endpoint called: /api/{path}")
-        
-        # If it's a chat-related path, handle it
-        if "chat" in path.lower():
-            body = await request.json()
-            query = body.get("message", "")
-            
-            response_text = await get_openai_response(query, "anonymous")
-            
-            return {
-                "response": response_text,
-                "status": "success",
-                "assistant": "MORVO",
-                "endpoint": f"/api/{path}",
-                "timestamp": "2025-08-10T12:06:00Z"
-            }
-        
-        # For other API calls, return a generic response
-        return {
-            "message": f"API endpoint /api/{path} called",
-            "status": "success",
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
-        
-    except Exception as e:
-        logger.error(f"Catch-all API endpoint error: {e}")
-        logger.error(traceback.format_exc())
-        return {
-            "response": "I'm sorry, but I encountered an error processing your request. Please try again.",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response="I'm sorry, but I encountered an error processing your request. Please try again.",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
 
 # Add a simple test chat endpoint that doesn't depend on any external services
-@app.post("/test-chat")
-async def test_chat(request: Request):
+@app.post(
+    "/test-chat", response_model=ChatResponse, dependencies=[Depends(enforce_chat_limits)], openapi_extra=CHAT_BODY_OPENAPI
+)
+async def test_chat(body: ChatMessage = Depends(parse_chat_body)):
     """Simple test chat endpoint for debugging"""
     try:
-        body = await request.json()
-        query = body.get("message", "")
+        query = body.message
         
-        logger.info(f"Test chat query received: {query}")
+        logger.debug(f"Test chat query received: {redact_message(query)}")
         
         # Get AI response from OpenAI
-        response_text = await get_openai_response(query, "test_user")
+        response_text = await get_openai_response(query, "test_user", latency_budget=body.latency_budget)
         
-        return {
-            "response": response_text,
-            "status": "success",
-            "endpoint": "/test-chat",
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response=response_text,
+            status="success",
+            endpoint="/test-chat",
+            timestamp=utc_now()
+        ))
     except Exception as e:
         logger.error(f"Test chat endpoint error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "response": f"Test failed with error: {str(e)}",
-            "status": "error",
-            "error": str(e),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        return model_response(ChatResponse(
+            response=f"Test failed with error: {str(e)}",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
 
 # Supabase Table Endpoints
-@app.get("/api/seo-signals")
-async def get_seo_signals(limit: int = 10, offset: int = 0):
+async def table_page_response(table: str, limit: int, offset: int, cursor: str = None, fields: str = None):
+    """Fetch one page of a table for the list endpoints.
+
+    Rows are PostgREST JSON already, so they are rendered directly instead of
+    being re-validated against TablePage.
+    """
+    from morvo_python.app.supabase_client import fetch_table_page, parse_fields, SUPABASE_MAX_PAGE_SIZE
+    limit = max(1, min(limit, SUPABASE_MAX_PAGE_SIZE))
+    try:
+        columns = parse_fields(fields)
+        data, next_cursor = await fetch_table_page(table, limit, offset, cursor, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": retry_after_header(e.retry_after)})
+    except Exception as e:
+        logger.error(f"Error fetching {table}: {e}")
+        raise HTTPException(status_code=502, detail=f"Fetching {table} failed")
+    return json_response({
+        "status": "success",
+        "count": len(data),
+        "data": data,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
+
+@app.get("/api/seo-signals", response_model=TablePage)
+async def get_seo_signals(limit: int = 10, offset: int = 0, cursor: str = None, fields: str = None):
     """Get SEO signals data from Supabase"""
     try:
-        from morvo_python.app.supabase_client import fetch_seo_data
-        data = await fetch_seo_data()
-        return {
-            "status": "success",
-            "count": len(data),
-            "data": data,
-            "limit": limit,
-            "offset": offset
-        }
+        return await table_page_response("seo_signals", limit, offset, cursor, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"SEO signals endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/mentions")
-async def get_mentions(limit: int = 10, offset: int = 0):
+@app.get("/api/mentions", response_model=TablePage)
+async def get_mentions(limit: int = 10, offset: int = 0, cursor: str = None, fields: str = None):
     """Get brand mentions data from Supabase"""
     try:
-        from morvo_python.app.supabase_client import fetch_mentions_data
-        data = await fetch_mentions_data()
-        return {
-            "status": "success",
-            "count": len(data),
-            "data": data,
-            "limit": limit,
-            "offset": offset
-        }
+        return await table_page_response("mentions", limit, offset, cursor, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Mentions endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/posts")
-async def get_posts(limit: int = 10, offset: int = 0):
+@app.get("/api/posts", response_model=TablePage)
+async def get_posts(limit: int = 10, offset: int = 0, cursor: str = None, fields: str = None):
     """Get social media posts data from Supabase"""
     try:
-        from morvo_python.app.supabase_client import fetch_posts_data
-        data = await fetch_posts_data()
-        return {
-            "status": "success",
-            "count": len(data),
-            "data": data,
-            "limit": limit,
-            "offset": offset
-        }
+        return await table_page_response("posts", limit, offset, cursor, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Posts endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -551,7 +955,7 @@ async def get_supabase_status():
             "status": "success",
             "supabase_connected": is_connected,
             "tables": ["seo_signals", "mentions", "posts"],
-            "timestamp": "2025-08-10T12:06:00Z"
+            "timestamp": utc_timestamp()
         }
     except Exception as e:
         logger.error(f"Supabase status endpoint error: {e}")
@@ -566,82 +970,295 @@ async def get_supabase_status():
 async def get_all_data(limit: int = 5):
     """Get data from all tables"""
     try:
-        from morvo_python.app.supabase_client import fetch_seo_data, fetch_mentions_data, fetch_posts_data
+        from morvo_python.app.supabase_client import fetch_tables, DATA_TABLES, SUPABASE_MAX_PAGE_SIZE
         
-        seo_data = await fetch_seo_data()
-        mentions_data = await fetch_mentions_data()
-        posts_data = await fetch_posts_data()
+        # Tables are fetched concurrently with their own deadline; failures come back per table
+        limit = max(1, min(limit, SUPABASE_MAX_PAGE_SIZE))
+        results = await fetch_tables(list(DATA_TABLES), limit)
         
-        return {
-            "status": "success",
-            "seo_signals": {
-                "count": len(seo_data),
-                "data": seo_data[:limit]
-            },
-            "mentions": {
-                "count": len(mentions_data),
-                "data": mentions_data[:limit]
-            },
-            "posts": {
-                "count": len(posts_data),
-                "data": posts_data[:limit]
-            },
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+        failed = [table for table, result in results.items() if result["status"] != "ok"]
+        if not failed:
+            status = "success"
+        elif len(failed) < len(results):
+            status = "partial"
+        else:
+            status = "error"
+        
+        return json_response({
+            "status": status,
+            **results,
+            "failed_tables": failed,
+            "timestamp": utc_timestamp()
+        })
     except Exception as e:
         logger.error(f"All data endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/search")
-async def search_data(request: Request):
+@app.get("/api/dashboard", response_model=DashboardData)
+async def get_dashboard():
+    """Dashboard summary served from incrementally maintained aggregates"""
+    try:
+        from morvo_python.app.aggregates import dashboard_aggregates
+        from morvo_python.app.alerts import alert_engine
+        summaries = dashboard_aggregates.summaries
+        return model_response(DashboardData(
+            seo_summary=summaries["seo_signals"],
+            mentions_summary=summaries["mentions"],
+            social_summary=summaries["posts"],
+            alerts=alert_engine.messages()
+        ))
+    except Exception as e:
+        logger.error(f"Dashboard endpoint error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/alerts")
+def get_alerts(limit: int = 50):
+    """Recent alerts with the rule and row timestamp that produced them"""
+    from morvo_python.app.alerts import alert_engine
+    alerts = list(reversed(alert_engine.alerts))[:max(0, limit)]
+    return {
+        "status": "success",
+        "count": len(alerts),
+        "alerts": alerts,
+        "rules": alert_engine.stats()["rules"]
+    }
+
+@app.post("/api/search", response_model=SearchResponse)
+async def search_data(body: SearchRequest):
     """Search across all tables"""
     try:
-        body = await request.json()
-        query = body.get("query", "")
-        table_filter = body.get("tables", ["seo_signals", "mentions", "posts"])
-        limit = body.get("limit", 10)
+        from morvo_python.app.row_feed import row_feed
+        from morvo_python.app.search_index import search_index, SEARCH_FIELDS, SEARCH_MAX_PAGE_SIZE
+        from morvo_python.app.supabase_client import build_filter_params, search_table_remote
         
-        logger.info(f"Search query: {query} in tables: {table_filter}")
+        query = body.query
+        table_filter = [table for table in (body.tables or list(SEARCH_FIELDS)) if table in SEARCH_FIELDS]
+        limit = max(1, min(body.limit, SEARCH_MAX_PAGE_SIZE))
+        offset = max(0, body.offset)
+        filters = body.filters or {}
+        errors = {}
         
-        results = {}
+        logger.debug(f"Search query: {redact_message(query)} in tables: {table_filter}")
         
-        if "seo_signals" in table_filter:
-            from morvo_python.app.supabase_client import fetch_seo_data
-            seo_data = await fetch_seo_data()
-            # Simple text search (you can enhance this with proper Supabase search)
-            filtered_seo = [item for item in seo_data if query.lower() in str(item).lower()]
-            results["seo_signals"] = filtered_seo[:limit]
-        
-        if "mentions" in table_filter:
-            from morvo_python.app.supabase_client import fetch_mentions_data
-            mentions_data = await fetch_mentions_data()
-            filtered_mentions = [item for item in mentions_data if query.lower() in str(item).lower()]
-            results["mentions"] = filtered_mentions[:limit]
+        if row_feed.synced.is_set():
+            # Ranked lookup in the in-process inverted index
+            engine = "index"
+            matches = search_index.search(query, table_filter, limit, offset, filters)
+        else:
+            # Index still warming up: push the search down to Postgres instead
+            engine = "postgres"
+            try:
+                for table in table_filter:
+                    build_filter_params(filters.get(table))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            pages = await asyncio.gather(*(
+                search_table_remote(table, query, SEARCH_FIELDS[table], limit, offset, filters.get(table))
+                for table in table_filter
+            ), return_exceptions=True)
+            matches = {}
+            for table, page in zip(table_filter, pages):
+                if isinstance(page, Exception):
+                    logger.error(f"Remote search error for {table}: {page}")
+                    errors[table] = str(page) or type(page).__name__
+                    page = []
+                matches[table] = {"data": page, "total": None}
+            if table_filter and len(errors) == len(table_filter):
+                raise HTTPException(status_code=502, detail="Search failed for every table")
         
-        if "posts" in table_filter:
-            from morvo_python.app.supabase_client import fetch_posts_data
-            posts_data = await fetch_posts_data()
-            filtered_posts = [item for item in posts_data if query.lower() in str(item).lower()]
-            results["posts"] = filtered_posts[:limit]
+        results = {table: match["data"] for table, match in matches.items()}
         
-        return {
-            "status": "success",
+        return json_response({
+            "status": "partial" if errors else "success",
             "query": query,
+            "engine": engine,
             "results": results,
+            "totals": {table: match["total"] for table, match in matches.items()},
             "total_results": sum(len(data) for data in results.values()),
-            "timestamp": "2025-08-10T12:06:00Z"
-        }
+            "limit": limit,
+            "offset": offset,
+            "errors": errors or None,
+            "timestamp": utc_timestamp()
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Search endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/cache/invalidate")
+async def invalidate_cache(request: Request, body: Optional[CacheInvalidation] = None):
+    """Invalidate cached table reads; accepts {"tables": [...]} or a Supabase database webhook payload"""
+    from morvo_python.app.row_feed import row_feed
+    from morvo_python.app.supabase_client import table_cache, DATA_TABLES
+    
+    require_token(request, "CACHE_INVALIDATE_TOKEN", "x-cache-invalidate-token", "invalidation")
+    
+    body = body or CacheInvalidation()
+    tables = body.tables or ([body.table] if body.table else None)
+    if tables is not None:
+        unknown = [table for table in tables if table not in DATA_TABLES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown tables: {unknown}")
+    
+    dropped = table_cache.invalidate(tables)
+    # Pull the changed rows into the search index without waiting for the next poll
+    row_feed.poll_soon(tables or list(DATA_TABLES))
+    logger.info(f"Table cache invalidated for {tables or 'all tables'} ({dropped} entries)")
+    
+    return {
+        "status": "success",
+        "tables": tables or list(DATA_TABLES),
+        "entries_dropped": dropped,
+        "timestamp": utc_timestamp()
+    }
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    """Hit ratios for the chat response cache and the table read cache"""
+    from morvo_python.app.supabase_client import table_cache
+    return {
+        "status": "success",
+        "chat_cache": chat_cache.stats(),
+        "table_cache": table_cache.stats()
+    }
+
+@app.get("/api/export/{table}")
+async def export_data(
+    table: str,
+    format: str = "ndjson",
+    fields: str = None,
+    since: str = None,
+    until: str = None,
+    gzip: bool = False,
+):
+    """Stream a table's full history (or a created_at range) as NDJSON or CSV"""
+    from morvo_python.app.export import EXPORT_FORMATS, export_table, parse_timestamp
+    from morvo_python.app.supabase_client import DATA_TABLES, parse_fields
+
+    if table not in DATA_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    try:
+        columns = parse_fields(fields)
+        body = export_table(table, format, columns, parse_timestamp(since), parse_timestamp(until), gzip)
+        # Fetch the first batch up front so a failing query is still reported with a proper status
+        first = await body.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        logger.error(f"Export of {table} failed: {e}")
+        raise HTTPException(status_code=502, detail=f"Export of {table} failed")
+
+    async def stream():
+        yield first
+        async for chunk in body:
+            yield chunk
+
+    filename = f"{table}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream(), media_type=EXPORT_FORMATS[format], headers=headers)
+
+@app.post("/api/ingest/{table}", response_model=IngestResult)
+async def ingest_data(request: Request, table: str, on_conflict: str = None, chunk_size: int = None, refresh: bool = True):
+    """Bulk load seo_signals, mentions or posts from a JSON array or NDJSON body"""
+    # Disabled until INGEST_TOKEN is set; checked before any of the body is read
+    require_token(request, "INGEST_TOKEN", "x-ingest-token", "ingest")
+    from morvo_python.app.ingest import (
+        INGEST_MODELS, INGEST_CHUNK_SIZE, INGEST_MAX_CHUNK, IngestInProgress, PayloadTooLarge,
+        ingest_rows, iter_ndjson, iter_json_array,
+    )
+    from morvo_python.app.row_feed import row_feed
+    from morvo_python.app.supabase_client import table_cache
+
+    if table not in INGEST_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if chunk_size is not None and not 1 <= chunk_size <= INGEST_MAX_CHUNK:
+        raise HTTPException(status_code=422, detail=f"chunk_size must be between 1 and {INGEST_MAX_CHUNK}")
+
+    content_type = request.headers.get("content-type", "")
+    ndjson = "ndjson" in content_type or "jsonlines" in content_type
+    items = iter_ndjson(request.stream()) if ndjson else iter_json_array(request.stream())
+
+    try:
+        result = await ingest_rows(
+            table,
+            items,
+            chunk_size=chunk_size or INGEST_CHUNK_SIZE,
+            on_conflict=on_conflict,
+            idempotency_key=request.headers.get("idempotency-key"),
+            # Plain inserts are all new rows, so they are published as written, backfilled ones included.
+            # Merged upserts may replace rows subscribers have already counted; they are left to the poll
+            on_written=(lambda rows: row_feed.publish_written(table, rows)) if refresh and not on_conflict else None,
+        )
+    except IngestInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+
+    # Inserted rows already reached the search index, aggregates and alerts; drop the stale cached reads
+    if refresh and result["rows_written"] and not result.get("replayed"):
+        table_cache.invalidate([table])
+        if on_conflict:
+            row_feed.poll_soon([table])
+
+    logger.info(
+        f"Ingested {result['rows_written']}/{result['rows_received']} rows into {table} "
+        f"({result['rows_rejected']} rejected, {result['rows_failed']} failed)"
+    )
+    status = "success" if not result["rows_rejected"] and not result["rows_failed"] else "partial"
+    if result["rows_received"] and not result["rows_written"] and not result["rows_skipped"]:
+        status = "error"
+    return model_response(IngestResult(status=status, **result, timestamp=utc_now()))
+
+# Add a catch-all chat endpoint that handles any POST request to /api/*
+# Registered last so the specific /api routes above are matched first
+@app.post("/api/{path:path}", dependencies=[Depends(enforce_chat_limits)])
+async def catch_all_api(request: Request, path: str):
+    """Catch-all endpoint for any API calls"""
+    body = await parse_chat_body(request) if "chat" in path.lower() else None
+    try:
+        # If it's a chat-related path, handle it
+        if body is not None:
+            response_text = await get_openai_response(body.message, "anonymous", latency_budget=body.latency_budget)
+            
+            return model_response(ChatResponse(
+                response=response_text,
+                status="success",
+                assistant="MORVO",
+                endpoint=f"/api/{path}",
+                timestamp=utc_now()
+            ))
+        
+        # For other API calls, return a generic response
+        return {
+            "message": f"API endpoint /api/{path} called",
+            "status": "success",
+            "timestamp": utc_timestamp()
+        }
+        
+    except Exception as e:
+        logger.error(f"Catch-all API endpoint error: {e}")
+        logger.error(traceback.format_exc())
+        return model_response(ChatResponse(
+            response="I'm sorry, but I encountered an error processing your request. Please try again.",
+            status="error",
+            error=str(e),
+            timestamp=utc_now()
+        ))
+
 # Add this for Railway port:
 if __name__ == "__main__":
     try:
-        import uvicorn
-        port = int(os.environ.get("PORT", 8000))
-        logger.info(f"Starting server on port {port}")
-        uvicorn.run(app, host="0.0.0.0", port=port)
+        from morvo_python.app.server import serve
+        serve()
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
         logger.error(traceback.format_exc())
\ No newline at end of file
@@ -0,0 +1,175 @@
+import os
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sentiment histogram used for percentiles (scores are clipped to [-1, 1])
+SENTIMENT_BINS = int(os.getenv("DASHBOARD_SENTIMENT_BINS", "2000"))
+SENTIMENT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _column(rows: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """One numeric column of a batch; missing or non-numeric values become 0"""
+    values = np.empty(len(rows), dtype=np.float64)
+    for i, row in enumerate(rows):
+        value = row.get(field)
+        try:
+            values[i] = float(value) if value is not None else 0.0
+        except (TypeError, ValueError):
+            values[i] = 0.0
+    return values
+
+
+class SEOAggregates:
+    """Running sums over seo_signals, updated one batch at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.sum_change = 0.0
+        self.sum_position = 0.0
+        self.sum_position_volume = 0.0
+        self.sum_volume = 0.0
+        self.improved = 0
+        self.declined = 0
+
+    def add(self, rows: List[Dict[str, Any]]):
+        position = _column(rows, "position")
+        change = _column(rows, "change")
+        volume = _column(rows, "volume")
+        self.count += len(rows)
+        self.sum_change += float(change.sum())
+        self.sum_position += float(position.sum())
+        self.sum_position_volume += float(position @ volume)
+        self.sum_volume += float(volume.sum())
+        self.improved += int(np.count_nonzero(change > 0))
+        self.declined += int(np.count_nonzero(change < 0))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "signals": self.count,
+            "average_position": round(self.sum_position / self.count, 3) if self.count else None,
+            "average_position_change": round(self.sum_change / self.count, 3) if self.count else None,
+            "volume_weighted_rank": round(self.sum_position_volume / self.sum_volume, 3) if self.sum_volume else None,
+            "total_volume": int(self.sum_volume),
+            "improved": self.improved,
+            "declined": self.declined,
+        }
+
+
+class MentionAggregates:
+    """Sentiment mean and histogram-based percentiles over mentions"""
+
+    def __init__(self, bins: int = SENTIMENT_BINS):
+        self.edges = np.linspace(-1.0, 1.0, bins + 1)
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self.count = 0
+        self.sum_sentiment = 0.0
+        self.sum_reach = 0.0
+        self.by_source: Dict[str, int] = {}
+
+    def add(self, rows: List[Dict[str, Any]]):
+        sentiment = np.clip(_column(rows, "sentiment"), -1.0, 1.0)
+        reach = _column(rows, "reach")
+        self.histogram += np.histogram(sentiment, bins=self.edges)[0]
+        self.count += len(rows)
+        self.sum_sentiment += float(sentiment.sum())
+        self.sum_reach += float(reach.sum())
+        sources, counts = np.unique([str(row.get("source") or "unknown") for row in rows], return_counts=True)
+        for source, count in zip(sources.tolist(), counts.tolist()):
+            self.by_source[source] = self.by_source.get(source, 0) + count
+
+    def percentiles(self) -> Dict[str, Optional[float]]:
+        if not self.count:
+            return {f"p{p}": None for p in SENTIMENT_PERCENTILES}
+        cumulative = np.cumsum(self.histogram)
+        targets = np.array(SENTIMENT_PERCENTILES) / 100.0 * self.count
+        indexes = np.searchsorted(cumulative, targets, side="left")
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        return {f"p{p}": round(float(centers[i]), 3) for p, i in zip(SENTIMENT_PERCENTILES, indexes)}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "mentions": self.count,
+            "sentiment_mean": round(self.sum_sentiment / self.count, 4) if self.count else None,
+            "sentiment_percentiles": self.percentiles(),
+            "total_reach": int(self.sum_reach),
+            "by_source": dict(sorted(self.by_source.items(), key=lambda item: item[1], reverse=True)),
+        }
+
+
+class SocialAggregates:
+    """Per-platform engagement totals over posts"""
+
+    FIELDS = ("likes", "shares", "comments", "reach")
+
+    def __init__(self):
+        # platform -> [posts, likes, shares, comments, reach]
+        self.platforms: Dict[str, np.ndarray] = {}
+
+    def add(self, rows: List[Dict[str, Any]]):
+        platforms, codes = np.unique(
+            [str(row.get("platform") or "unknown").lower() for row in rows], return_inverse=True
+        )
+        totals = np.vstack(
+            [np.bincount(codes, minlength=len(platforms))]
+            + [np.bincount(codes, weights=_column(rows, field), minlength=len(platforms)) for field in self.FIELDS]
+        )
+        for i, platform in enumerate(platforms.tolist()):
+            current = self.platforms.get(platform)
+            self.platforms[platform] = totals[:, i] if current is None else current + totals[:, i]
+
+    def summary(self) -> Dict[str, Any]:
+        platforms = {}
+        for platform, (posts, likes, shares, comments, reach) in self.platforms.items():
+            engagements = likes + shares + comments
+            platforms[platform] = {
+                "posts": int(posts),
+                "likes": int(likes),
+                "shares": int(shares),
+                "comments": int(comments),
+                "reach": int(reach),
+                "engagements_per_post": round(engagements / posts, 2) if posts else None,
+                "engagement_rate": round(engagements / reach, 4) if reach else None,
+            }
+        return {
+            "posts": int(sum(totals[0] for totals in self.platforms.values())),
+            "platforms": platforms,
+        }
+
+
+class DashboardAggregates:
+    """Materialized dashboard aggregates kept current by the row feed"""
+
+    def __init__(self):
+        self.seo = SEOAggregates()
+        self.mentions = MentionAggregates()
+        self.social = SocialAggregates()
+        self.summaries: Dict[str, Dict[str, Any]] = {
+            "seo_signals": self.seo.summary(),
+            "mentions": self.mentions.summary(),
+            "posts": self.social.summary(),
+        }
+        self.updated_at: Optional[str] = None
+
+    def add_rows(self, table: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        if table == "seo_signals":
+            self.seo.add(rows)
+            self.summaries[table] = self.seo.summary()
+        elif table == "mentions":
+            self.mentions.add(rows)
+            self.summaries[table] = self.mentions.summary()
+        elif table == "posts":
+            self.social.add(rows)
+            self.summaries[table] = self.social.summary()
+        else:
+            return
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+
+
+dashboard_aggregates = DashboardAggregates()
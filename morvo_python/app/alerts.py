@@ -0,0 +1,223 @@
+import os
+import json
+import bisect
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Alert engine settings
+ALERT_RULES = os.getenv("ALERT_RULES")
+ALERT_RULES_FILE = os.getenv("ALERT_RULES_FILE")
+ALERT_MAX_ALERTS = int(os.getenv("ALERT_MAX_ALERTS", "100"))
+
+DEFAULT_ALERT_RULES = [
+    {"name": "keyword_drop", "type": "keyword_drop", "min_positions": 5},
+    {"name": "negative_sentiment_spike", "type": "sentiment_spike", "window_minutes": 60,
+     "threshold": -0.3, "min_mentions": 10},
+    {"name": "viral_post", "type": "viral_post", "min_engagement": 1000, "min_engagement_rate": 0.1},
+]
+
+
+def load_alert_rules() -> List[Dict[str, Any]]:
+    """Rules from ALERT_RULES (JSON) or ALERT_RULES_FILE, falling back to the defaults"""
+    try:
+        if ALERT_RULES:
+            return json.loads(ALERT_RULES)
+        if ALERT_RULES_FILE:
+            with open(ALERT_RULES_FILE) as f:
+                return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load alert rules, using defaults: {e}")
+    return DEFAULT_ALERT_RULES
+
+
+def _timestamp(row: Dict[str, Any]) -> datetime:
+    value = row.get("created_at")
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(str(value))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return datetime.now(timezone.utc)
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _setting(key: str, value: Any) -> float:
+    """A numeric rule setting, raising ValueError for anything else (e.g. a quoted number)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    return value
+
+
+class KeywordDropRule:
+    """Fires when a keyword falls more than min_positions places; signals older than its latest are ignored"""
+
+    table = "seo_signals"
+
+    def __init__(self, name: str, min_positions: int = 5):
+        self.name = name
+        self.min_positions = _setting("min_positions", min_positions)
+        # keyword -> (timestamp, position) of its latest signal
+        self.positions: Dict[str, Tuple[float, int]] = {}
+
+    def evaluate(self, row: Dict[str, Any]) -> Optional[str]:
+        keyword = row.get("keyword")
+        if not keyword or row.get("position") is None:
+            return None
+        at = _timestamp(row).timestamp()
+        position = int(_number(row.get("position")))
+        previous = self.positions.get(keyword)
+        if previous is not None and at < previous[0]:
+            # A backfilled signal says nothing about where the keyword ranks now
+            return None
+        self.positions[keyword] = (at, position)
+        drop = position - previous[1] if previous is not None else -int(_number(row.get("change")))
+        if drop > self.min_positions:
+            return f"Keyword '{keyword}' dropped {drop} positions to #{position}"
+        return None
+
+
+class SentimentSpikeRule:
+    """Fires when mean sentiment over a sliding time window falls below a threshold.
+
+    Late (backfilled) mentions still inside the window are slotted in by time; older ones are ignored.
+    """
+
+    table = "mentions"
+
+    def __init__(self, name: str, window_minutes: float = 60, threshold: float = -0.3, min_mentions: int = 10):
+        self.name = name
+        self.window = _setting("window_minutes", window_minutes) * 60
+        self.threshold = _setting("threshold", threshold)
+        self.min_mentions = _setting("min_mentions", min_mentions)
+        self.samples: Deque[Tuple[float, float]] = deque()
+        self.total = 0.0
+        self.active = False
+
+    def evaluate(self, row: Dict[str, Any]) -> Optional[str]:
+        at = _timestamp(row).timestamp()
+        sentiment = _number(row.get("sentiment"))
+        if self.samples and at < self.samples[-1][0]:
+            newest = self.samples[-1][0]
+            if at < newest - self.window:
+                return None
+            self.samples.insert(bisect.bisect_right(self.samples, (at, sentiment)), (at, sentiment))
+        else:
+            newest = at
+            self.samples.append((at, sentiment))
+        self.total += sentiment
+        while self.samples and self.samples[0][0] < newest - self.window:
+            _, old = self.samples.popleft()
+            self.total -= old
+        count = len(self.samples)
+        mean = self.total / count
+        breached = count >= self.min_mentions and mean < self.threshold
+        # Fire once per spike, re-arm when the window recovers
+        if breached and not self.active:
+            self.active = True
+            return (
+                f"Negative sentiment spike: mean {mean:.2f} across {count} mentions "
+                f"in the last {int(self.window // 60)} minutes"
+            )
+        if not breached:
+            self.active = False
+        return None
+
+
+class ViralPostRule:
+    """Fires for posts above an engagement count or engagement rate"""
+
+    table = "posts"
+
+    def __init__(self, name: str, min_engagement: int = 1000, min_engagement_rate: Optional[float] = None):
+        self.name = name
+        self.min_engagement = _setting("min_engagement", min_engagement)
+        self.min_engagement_rate = (
+            _setting("min_engagement_rate", min_engagement_rate) if min_engagement_rate is not None else None
+        )
+
+    def evaluate(self, row: Dict[str, Any]) -> Optional[str]:
+        engagement = _number(row.get("likes")) + _number(row.get("shares")) + _number(row.get("comments"))
+        reach = _number(row.get("reach"))
+        rate = engagement / reach if reach else None
+        if engagement >= self.min_engagement or (
+            self.min_engagement_rate is not None and rate is not None and rate >= self.min_engagement_rate
+        ):
+            platform = row.get("platform") or "unknown"
+            detail = f" ({rate:.1%} of reach)" if rate is not None else ""
+            return f"Viral {platform} post: {int(engagement)} engagements{detail}"
+        return None
+
+
+RULE_TYPES: Dict[str, Callable[..., Any]] = {
+    "keyword_drop": KeywordDropRule,
+    "sentiment_spike": SentimentSpikeRule,
+    "viral_post": ViralPostRule,
+}
+
+
+class AlertEngine:
+    """Evaluates every rule over each incoming row exactly once"""
+
+    def __init__(self, rules: List[Dict[str, Any]], max_alerts: int = ALERT_MAX_ALERTS):
+        self.rules: Dict[str, List[Any]] = {}
+        for config in rules:
+            if not isinstance(config, dict):
+                logger.error(f"Skipping alert rule that is not an object: {config!r}")
+                continue
+            config = dict(config)
+            rule_type = config.pop("type", None)
+            rule_class = RULE_TYPES.get(rule_type)
+            if rule_class is None:
+                logger.error(f"Unknown alert rule type: {rule_type}")
+                continue
+            name = str(config.pop("name", rule_type))
+            try:
+                # Unknown (e.g. misspelled) settings raise TypeError, bad values ValueError
+                rule = rule_class(name=name, **config)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Skipping invalid alert rule {name!r}: {e}")
+                continue
+            self.rules.setdefault(rule.table, []).append(rule)
+        self.alerts: Deque[Dict[str, Any]] = deque(maxlen=max_alerts)
+        self.fired = 0
+
+    def add_rows(self, table: str, rows: List[Dict[str, Any]]):
+        rules = self.rules.get(table)
+        if not rules:
+            return
+        for row in rows:
+            for rule in rules:
+                message = rule.evaluate(row)
+                if message:
+                    self.fired += 1
+                    self.alerts.append({
+                        "rule": rule.name,
+                        "table": table,
+                        "message": message,
+                        "created_at": str(row.get("created_at") or datetime.now(timezone.utc).isoformat()),
+                    })
+
+    def messages(self) -> List[str]:
+        """Most recent alerts first"""
+        return [alert["message"] for alert in reversed(self.alerts)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": [rule.name for rules in self.rules.values() for rule in rules],
+            "fired": self.fired,
+            "retained": len(self.alerts),
+        }
+
+
+alert_engine = AlertEngine(load_alert_rules())
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            # The upstream call runs in its own task so one caller going away
+            # does not fail everyone else waiting on the same result
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Coalesced call failed for {key}: {task.exception()}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
+
+
+class _SharedStream:
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.updated = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+
+class StreamFanout:
+    """Fan a single upstream token stream out to every subscriber with the same key.
+
+    Late subscribers replay the tokens produced so far. The upstream stream is
+    cancelled once the last subscriber disconnects.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, _SharedStream] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def subscribe(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        shared = self._streams.get(key)
+        if shared is None:
+            self.leaders += 1
+            shared = _SharedStream()
+            self._streams[key] = shared
+            shared.task = asyncio.create_task(self._pump(key, shared, factory))
+        else:
+            self.followers += 1
+
+        shared.subscribers += 1
+        position = 0
+        try:
+            while True:
+                while position < len(shared.tokens):
+                    yield shared.tokens[position]
+                    position += 1
+                if shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                await shared.updated.wait()
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.done:
+                shared.task.cancel()
+                self._drop(key, shared)
+
+    async def _pump(self, key: str, shared: _SharedStream, factory: Callable[[], AsyncIterator[str]]):
+        try:
+            async for token in factory():
+                shared.tokens.append(token)
+                shared.notify()
+        except Exception as e:
+            shared.error = e
+        finally:
+            shared.done = True
+            shared.notify()
+            self._drop(key, shared)
+
+    def _drop(self, key: str, shared: _SharedStream):
+        if self._streams.get(key) is shared:
+            del self._streams[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._streams), "leaders": self.leaders, "followers": self.followers}
+
+
+# Shared de-duplication for chat completions
+chat_requests = SingleFlight()
+chat_streams = StreamFanout()
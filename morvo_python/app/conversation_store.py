@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from morvo_python.app.shared_state import SharedBackend, get_shared_backend
+
+logger = logging.getLogger(__name__)
+
+# Conversation memory settings
+CONVERSATION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "1500"))
+CONVERSATION_SUMMARY_MAX_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", "300"))
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))
+CONVERSATION_IDLE_TTL = float(os.getenv("CONVERSATION_IDLE_TTL", "1800"))
+CONVERSATION_PERSIST = os.getenv("CONVERSATION_PERSIST", "false").lower() == "true"
+
+# Characters of an evicted turn kept in the rolling summary
+SUMMARY_SNIPPET_CHARS = 160
+
+# (role, content, token_estimate) - tokens are counted once, when the turn is added
+Turn = Tuple[str, str, int]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return max(1, (len(text) + 3) // 4)
+
+
+class Conversation:
+    """Recent turns within the token budget plus a rolling summary of older ones"""
+
+    __slots__ = ("turns", "tokens", "summary", "summary_tokens", "last_access")
+
+    def __init__(self):
+        self.turns: Deque[Turn] = deque()
+        self.tokens = 0
+        self.summary: Deque[Tuple[str, int]] = deque()
+        self.summary_tokens = 0
+        self.last_access = time.monotonic()
+
+
+class ConversationStore:
+    """In-memory conversation history keyed by (user_id, session_id).
+
+    With a shared backend the backend copy is authoritative, so a session
+    continues on whichever worker serves its next message.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CONVERSATION_MAX_TOKENS,
+        summary_max_tokens: int = CONVERSATION_SUMMARY_MAX_TOKENS,
+        max_sessions: int = CONVERSATION_MAX_SESSIONS,
+        idle_ttl: float = CONVERSATION_IDLE_TTL,
+        persist: bool = CONVERSATION_PERSIST,
+        backend: Optional[SharedBackend] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.persist = persist
+        self.backend = backend
+        self._sessions: "OrderedDict[Tuple[str, str], Conversation]" = OrderedDict()
+        self.evicted_sessions = 0
+        self.summarized_turns = 0
+        self._pending_saves = set()
+        self._unshared = set()
+        self.backend_errors = 0
+
+    def _touch(self, key: Tuple[str, str]) -> Optional[Conversation]:
+        self._evict_idle()
+        conversation = self._sessions.get(key)
+        if conversation is not None:
+            conversation.last_access = time.monotonic()
+            self._sessions.move_to_end(key)
+        return conversation
+
+    def _evict_idle(self):
+        # Sessions are ordered by last access, so expired ones sit at the front
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            key, conversation = next(iter(self._sessions.items()))
+            if conversation.last_access > cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[key]
+            self.evicted_sessions += 1
+
+    async def get_context(self, user_id: str, session_id: str) -> List[Dict[str, str]]:
+        """Messages to place between the system prompt and the new user message"""
+        key = (user_id, session_id)
+        conversation = None
+        if self.backend is not None and key not in self._unshared:
+            conversation = await self._fetch_shared(key)
+        if conversation is None:
+            conversation = self._touch(key)
+        if conversation is None and self.persist:
+            conversation = await self._load(key)
+        if conversation is None:
+            return []
+
+        messages = []
+        if conversation.summary:
+            summary = "\n".join(line for line, _ in conversation.summary)
+            messages.append({"role": "system", "content": f"Earlier in this conversation:\n{summary}"})
+        messages.extend({"role": role, "content": content} for role, content, _ in conversation.turns)
+        return messages
+
+    def append(self, user_id: str, session_id: str, role: str, content: str):
+        """Add a turn and fold the oldest turns into the summary once over budget"""
+        key = (user_id, session_id)
+        conversation = self._touch(key)
+        if conversation is None:
+            conversation = Conversation()
+            self._sessions[key] = conversation
+            self._evict_idle()
+
+        tokens = estimate_tokens(content)
+        conversation.turns.append((role, content, tokens))
+        conversation.tokens += tokens
+        while conversation.tokens > self.max_tokens and len(conversation.turns) > 1:
+            self._summarize_oldest(conversation)
+
+        if self.persist:
+            self._background(self._save(key, role, content))
+        if self.backend is not None and key not in self._unshared:
+            # One write per burst of appends (a user turn and its answer)
+            self._unshared.add(key)
+            self._background(self._share(key))
+
+    def _background(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+
+    def _summarize_oldest(self, conversation: Conversation):
+        role, content, tokens = conversation.turns.popleft()
+        conversation.tokens -= tokens
+        self.summarized_turns += 1
+
+        snippet = " ".join(content.split())
+        if len(snippet) > SUMMARY_SNIPPET_CHARS:
+            snippet = snippet[:SUMMARY_SNIPPET_CHARS].rstrip() + "..."
+        line = f"- {role}: {snippet}"
+        line_tokens = estimate_tokens(line)
+        conversation.summary.append((line, line_tokens))
+        conversation.summary_tokens += line_tokens
+        while conversation.summary_tokens > self.summary_max_tokens and len(conversation.summary) > 1:
+            _, dropped = conversation.summary.popleft()
+            conversation.summary_tokens -= dropped
+
+    def clear(self, user_id: str, session_id: str):
+        self._sessions.pop((user_id, session_id), None)
+        if self.backend is not None:
+            self._background(self.backend.delete(self._shared_key((user_id, session_id))))
+
+    @staticmethod
+    def _shared_key(key: Tuple[str, str]) -> str:
+        return "morvo:conversation:" + json.dumps(key)
+
+    async def _share(self, key: Tuple[str, str]):
+        self._unshared.discard(key)
+        conversation = self._sessions.get(key)
+        if conversation is None:
+            return
+        raw = json.dumps({
+            "turns": [[role, content] for role, content, _ in conversation.turns],
+            "summary": [line for line, _ in conversation.summary],
+        }, ensure_ascii=False).encode("utf-8")
+        try:
+            await self.backend.set(self._shared_key(key), raw, ttl=self.idle_ttl)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error(f"Conversation backend set error: {e}")
+
+    async def _fetch_shared(self, key: Tuple[str, str]) -> Optional[Conversation]:
+        try:
+            raw = await self.backend.get(self._shared_key(key))
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error(f"Conversation backend get error: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        conversation = Conversation()
+        for role, content in data["turns"]:
+            tokens = estimate_tokens(content)
+            conversation.turns.append((role, content, tokens))
+            conversation.tokens += tokens
+        for line in data["summary"]:
+            line_tokens = estimate_tokens(line)
+            conversation.summary.append((line, line_tokens))
+            conversation.summary_tokens += line_tokens
+        self._sessions[key] = conversation
+        self._sessions.move_to_end(key)
+        self._evict_idle()
+        return conversation
+
+    async def _load(self, key: Tuple[str, str]) -> Optional[Conversation]:
+        from morvo_python.app.supabase_client import fetch_conversation_turns
+        rows = await fetch_conversation_turns(key[0], key[1], limit=50)
+        if not rows:
+            return None
+        conversation = Conversation()
+        self._sessions[key] = conversation
+        for row in rows:
+            tokens = estimate_tokens(row["content"])
+            conversation.turns.append((row["role"], row["content"], tokens))
+            conversation.tokens += tokens
+            while conversation.tokens > self.max_tokens and len(conversation.turns) > 1:
+                self._summarize_oldest(conversation)
+        return conversation
+
+    async def _save(self, key: Tuple[str, str], role: str, content: str):
+        from morvo_python.app.supabase_client import save_conversation_turn
+        await save_conversation_turn(key[0], key[1], role, content)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "max_tokens": self.max_tokens,
+            "evicted_sessions": self.evicted_sessions,
+            "summarized_turns": self.summarized_turns,
+            "persist": self.persist,
+            "backend": self.backend.name if self.backend else None,
+            "backend_errors": self.backend_errors,
+        }
+
+
+conversation_store = ConversationStore(backend=get_shared_backend())
@@ -0,0 +1,108 @@
+import os
+import io
+import csv
+import json
+import zlib
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from morvo_python.app.supabase_client import SUPABASE_KEYSET_TIEBREAKER, fetch_rows_after
+
+logger = logging.getLogger(__name__)
+
+# Export settings
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[str]:
+    """Validate a since/until bound, raising ValueError so it never reaches the filter unchecked"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value}")
+
+
+async def iter_table_batches(
+    table: str,
+    columns: Optional[List[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Walk a table oldest first with keyset pagination, one batch in memory at a time.
+
+    Reads go straight to PostgREST rather than through the table cache so a
+    full-history export does not evict the pages the dashboards are using.
+    """
+    after = None
+    while True:
+        rows = await fetch_rows_after(table, after, batch_size, columns, until, since)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        after = (last["created_at"], last.get(SUPABASE_KEYSET_TIEBREAKER))
+
+
+async def encode_ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows).encode()
+
+
+async def encode_csv(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    columns: Optional[List[str]] = None,
+) -> AsyncIterator[bytes]:
+    """CSV with the header taken from the requested fields or the first row"""
+    buffer = io.StringIO()
+    writer = None
+    async for rows in batches:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=columns or list(rows[0]), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Compress a byte stream incrementally into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        # Flush per batch so the client keeps receiving data during long exports
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def export_table(
+    table: str,
+    fmt: str = "ndjson",
+    columns: Optional[List[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """Encoded export body for one table"""
+    batches = iter_table_batches(table, columns, since, until)
+    body = encode_csv(batches, columns) if fmt == "csv" else encode_ndjson(batches)
+    if gzip:
+        body = gzip_stream(body)
+    exported = 0
+    async for chunk in body:
+        exported += len(chunk)
+        yield chunk
+    logger.info(f"Exported {table} as {fmt}{' (gzip)' if gzip else ''}: {exported} bytes")
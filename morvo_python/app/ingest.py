@@ -0,0 +1,304 @@
+import os
+import json
+import codecs
+import hashlib
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from morvo_python.app.models import SEOSignal, Mention, SocialPost
+from morvo_python.app.response_cache import TTLLRUCache
+from morvo_python.app.supabase_client import rest_upsert
+
+logger = logging.getLogger(__name__)
+
+# Ingestion settings
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "500"))
+# Largest chunk_size a request may ask for; bounds the rows held per chunk and sent in one write
+INGEST_MAX_CHUNK = int(os.getenv("INGEST_MAX_CHUNK", "5000"))
+INGEST_MAX_PENDING_CHUNKS = int(os.getenv("INGEST_MAX_PENDING_CHUNKS", "4"))
+INGEST_WRITE_CONCURRENCY = int(os.getenv("INGEST_WRITE_CONCURRENCY", "2"))
+# Largest single row (NDJSON line or JSON array item); only the row being parsed is buffered
+INGEST_MAX_ROW_BYTES = int(os.getenv("INGEST_MAX_ROW_BYTES", str(1024 * 1024)))
+INGEST_IDEMPOTENCY_TTL = float(os.getenv("INGEST_IDEMPOTENCY_TTL", "86400"))
+INGEST_MAX_REPORTED_ERRORS = 20
+
+INGEST_MODELS: Dict[str, type] = {
+    "seo_signals": SEOSignal,
+    "mentions": Mention,
+    "posts": SocialPost,
+}
+
+
+class IngestInProgress(Exception):
+    """Raised when a request reuses the idempotency key of an ingest still running"""
+
+
+class PayloadTooLarge(Exception):
+    """Raised when a single row of the body exceeds INGEST_MAX_ROW_BYTES"""
+
+
+def _row_too_large() -> PayloadTooLarge:
+    return PayloadTooLarge(f"A row exceeds {INGEST_MAX_ROW_BYTES} bytes")
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Parse newline-delimited JSON as the body streams in; bad lines yield the exception"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > INGEST_MAX_ROW_BYTES:
+            raise _row_too_large()
+        for line in lines:
+            if len(line) > INGEST_MAX_ROW_BYTES:
+                raise _row_too_large()
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield e
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except ValueError as e:
+            yield e
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Items of a JSON array body (or a single object), parsed one item at a time as the body streams in.
+
+    Only the item being parsed is held in memory, so each parse step is
+    bounded by INGEST_MAX_ROW_BYTES. Malformed JSON raises ValueError.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    text = ""
+    pos = 0
+    in_array: Optional[bool] = None  # undecided until the first character
+    need_comma = False
+    after_comma = False
+    finished = False
+
+    def parse(eof: bool):
+        nonlocal pos, in_array, need_comma, after_comma, finished
+        while True:
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(text):
+                if eof and in_array and not finished:
+                    raise ValueError("Unterminated JSON array")
+                return
+            if finished:
+                raise ValueError(f"Unexpected data after the JSON body: {text[pos:pos + 20]!r}")
+            if in_array is None:
+                in_array = text[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and text[pos] == "]" and not after_comma:
+                pos += 1
+                finished = True
+                continue
+            if need_comma:
+                if text[pos] != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {text[pos:pos + 20]!r}")
+                pos += 1
+                need_comma = False
+                after_comma = True
+                continue
+            try:
+                value, end = _decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                if len(text) - pos > INGEST_MAX_ROW_BYTES:
+                    raise _row_too_large()
+                # Most likely an item cut off by the chunk boundary; wait for more of the body
+                return
+            if end == len(text) and not eof and not isinstance(value, (dict, list)):
+                # A bare number or literal may continue in the next chunk
+                return
+            pos = end
+            after_comma = False
+            if in_array:
+                need_comma = True
+            else:
+                finished = True
+            yield value
+
+    async for chunk in chunks:
+        text = text[pos:] + utf8.decode(chunk)
+        pos = 0
+        for item in parse(eof=False):
+            yield item
+    text = text[pos:] + utf8.decode(b"", final=True)
+    pos = 0
+    for item in parse(eof=True):
+        yield item
+
+
+class IngestStats:
+    """Lifetime ingestion counters"""
+
+    def __init__(self):
+        self.requests = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.rows_failed = 0
+        self.rows_skipped = 0
+        self.seconds = 0.0
+
+    def record(self, result: Dict[str, Any]):
+        self.requests += 1
+        self.rows_written += result["rows_written"]
+        self.rows_rejected += result["rows_rejected"]
+        self.rows_failed += result["rows_failed"]
+        self.rows_skipped += result["rows_skipped"]
+        self.seconds += result["elapsed_seconds"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "rows_written": self.rows_written,
+            "rows_rejected": self.rows_rejected,
+            "rows_failed": self.rows_failed,
+            "rows_skipped": self.rows_skipped,
+            "rows_per_second": round(self.rows_written / self.seconds, 1) if self.seconds else None,
+        }
+
+
+ingest_stats = IngestStats()
+_idempotency_results = TTLLRUCache(10000, 16 * 1024 * 1024, INGEST_IDEMPOTENCY_TTL)
+# Digests of the chunks each idempotency key has already written, so a retry after a partial failure
+# skips them instead of inserting those rows twice
+_committed_chunks = TTLLRUCache(10000, 64 * 1024 * 1024, INGEST_IDEMPOTENCY_TTL)
+_in_progress = set()
+
+
+def chunk_digest(index: int, chunk: List[Dict[str, Any]]) -> str:
+    """Identifies a chunk by its position in the upload and its rows"""
+    rows = json.dumps(chunk, sort_keys=True, separators=(",", ":")).encode()
+    return f"{index}:{hashlib.sha256(rows).hexdigest()}"
+
+
+async def ingest_rows(
+    table: str,
+    items: AsyncIterator[Any],
+    chunk_size: int = INGEST_CHUNK_SIZE,
+    on_conflict: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+    on_written: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> Dict[str, Any]:
+    """Validate rows as they stream in and upsert them in chunks.
+
+    Parsed chunks go through a bounded queue to the writers, so a slow
+    database stops the parser (and the request body read) instead of
+    buffering the whole upload in memory. on_written receives the stored
+    rows of each chunk once it is written.
+    """
+    committed = set()
+    if idempotency_key:
+        replay_key = (table, idempotency_key)
+        previous = _idempotency_results.get(replay_key)
+        if previous is not None:
+            return {**previous, "replayed": True}
+        if replay_key in _in_progress:
+            raise IngestInProgress(f"Ingest with idempotency key {idempotency_key} is still running")
+        _in_progress.add(replay_key)
+        committed = _committed_chunks.get(replay_key) or set()
+
+    model: BaseModel = INGEST_MODELS[table]
+    chunk_size = max(1, min(chunk_size, INGEST_MAX_CHUNK))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_MAX_PENDING_CHUNKS)
+    result = {
+        "table": table,
+        "rows_received": 0,
+        "rows_written": 0,
+        "rows_rejected": 0,
+        "rows_failed": 0,
+        "rows_skipped": 0,
+        "chunks_written": 0,
+        "errors": [],
+    }
+
+    def report(error: Dict[str, Any]):
+        if len(result["errors"]) < INGEST_MAX_REPORTED_ERRORS:
+            result["errors"].append(error)
+
+    async def writer():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, chunk = item
+            digest = chunk_digest(index, chunk) if idempotency_key else None
+            if digest in committed:
+                result["rows_skipped"] += len(chunk)
+                continue
+            try:
+                response = await rest_upsert(table, chunk, on_conflict, returning=on_written is not None)
+                result["rows_written"] += len(chunk)
+                result["chunks_written"] += 1
+                if digest is not None:
+                    committed.add(digest)
+                    _committed_chunks.set(replay_key, committed, 100 * len(committed))
+            except Exception as e:
+                logger.error(f"Ingest chunk write failed for {table}: {e}")
+                result["rows_failed"] += len(chunk)
+                report({"chunk_rows": len(chunk), "error": str(e)})
+                continue
+            if on_written is not None:
+                try:
+                    stored = response.json()
+                except ValueError:
+                    stored = None
+                try:
+                    on_written(stored if isinstance(stored, list) else chunk)
+                except Exception as e:
+                    logger.error(f"Publishing ingested rows for {table} failed: {e}")
+
+    started = time.perf_counter()
+    writers = [asyncio.create_task(writer()) for _ in range(max(1, INGEST_WRITE_CONCURRENCY))]
+    try:
+        chunk: List[Dict[str, Any]] = []
+        chunks_queued = 0
+        async for item in items:
+            result["rows_received"] += 1
+            row_number = result["rows_received"]
+            if isinstance(item, Exception):
+                result["rows_rejected"] += 1
+                report({"row": row_number, "error": f"Invalid JSON: {item}"})
+                continue
+            try:
+                chunk.append(model.model_validate(item).model_dump(mode="json"))
+            except ValidationError as e:
+                result["rows_rejected"] += 1
+                report({"row": row_number, "error": e.errors(include_url=False, include_context=False)})
+                continue
+            if len(chunk) >= chunk_size:
+                await queue.put((chunks_queued, chunk))
+                chunks_queued += 1
+                chunk = []
+        if chunk:
+            await queue.put((chunks_queued, chunk))
+    finally:
+        for _ in writers:
+            await queue.put(None)
+        await asyncio.gather(*writers, return_exceptions=True)
+        if idempotency_key:
+            _in_progress.discard((table, idempotency_key))
+
+    elapsed = time.perf_counter() - started
+    result["elapsed_seconds"] = round(elapsed, 3)
+    result["rows_per_second"] = round(result["rows_written"] / elapsed, 1) if elapsed else None
+    ingest_stats.record(result)
+    if idempotency_key and not result["rows_failed"]:
+        _idempotency_results.set((table, idempotency_key), result, len(json.dumps(result)))
+    return result
@@ -0,0 +1,182 @@
+import os
+import heapq
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from morvo_python.app.conversation_store import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Data insight settings
+INSIGHTS_ENABLED = os.getenv("INSIGHTS_ENABLED", "true").lower() == "true"
+INSIGHTS_MAX_TOKENS = int(os.getenv("INSIGHTS_MAX_TOKENS", "200"))
+INSIGHTS_TOP_N = int(os.getenv("INSIGHTS_TOP_N", "3"))
+INSIGHTS_SENTIMENT_DAYS = int(os.getenv("INSIGHTS_SENTIMENT_DAYS", "14"))
+
+# Rows without a user_id column feed the shared summary every user sees
+GLOBAL_SCOPE = "__all__"
+
+
+def _number(value: Any, default: float = 0.0) -> float:
+    try:
+        return float(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+class UserInsights:
+    """Incremental state behind one scope's summary"""
+
+    __slots__ = ("keywords", "sentiment_days", "top_posts", "summary", "text")
+
+    def __init__(self):
+        # keyword -> (created_at, position, change, volume) of its latest signal
+        self.keywords: Dict[str, Tuple[str, int, int, int]] = {}
+        # day -> [sentiment sum, mention count]
+        self.sentiment_days: Dict[str, List[float]] = {}
+        # min-heap of (engagement, created_at, platform, content)
+        self.top_posts: List[Tuple[float, str, str, str]] = []
+        self.summary: Dict[str, Any] = {}
+        self.text = ""
+
+
+class InsightsBuilder:
+    """Precomputed per-user summaries of seo_signals, mentions and posts.
+
+    Rows arrive through the row feed and only touch the affected scope, so the
+    chat path just reads the rendered summary.
+    """
+
+    def __init__(self, max_tokens: int = INSIGHTS_MAX_TOKENS, top_n: int = INSIGHTS_TOP_N):
+        self.max_tokens = max_tokens
+        self.top_n = top_n
+        self._scopes: Dict[str, UserInsights] = {}
+
+    def _scope(self, user_id: Optional[str]) -> UserInsights:
+        key = user_id or GLOBAL_SCOPE
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = UserInsights()
+        return scope
+
+    def add_rows(self, table: str, rows: List[Dict[str, Any]]):
+        touched = set()
+        for row in rows:
+            scope = self._scope(row.get("user_id"))
+            touched.add(scope)
+            if table == "seo_signals":
+                self._add_signal(scope, row)
+            elif table == "mentions":
+                self._add_mention(scope, row)
+            elif table == "posts":
+                self._add_post(scope, row)
+        for scope in touched:
+            self._render(scope)
+
+    def _add_signal(self, scope: UserInsights, row: Dict[str, Any]):
+        keyword = row.get("keyword")
+        if not keyword:
+            return
+        created_at = str(row.get("created_at") or "")
+        current = scope.keywords.get(keyword)
+        if current is None or created_at >= current[0]:
+            scope.keywords[keyword] = (
+                created_at,
+                int(_number(row.get("position"))),
+                int(_number(row.get("change"))),
+                int(_number(row.get("volume"))),
+            )
+
+    def _add_mention(self, scope: UserInsights, row: Dict[str, Any]):
+        day = str(row.get("created_at") or "")[:10]
+        if not day:
+            return
+        bucket = scope.sentiment_days.setdefault(day, [0.0, 0])
+        bucket[0] += _number(row.get("sentiment"))
+        bucket[1] += 1
+        if len(scope.sentiment_days) > INSIGHTS_SENTIMENT_DAYS:
+            del scope.sentiment_days[min(scope.sentiment_days)]
+
+    def _add_post(self, scope: UserInsights, row: Dict[str, Any]):
+        engagement = _number(row.get("likes")) + _number(row.get("shares")) + _number(row.get("comments"))
+        entry = (engagement, str(row.get("created_at") or ""), str(row.get("platform") or ""), str(row.get("content") or ""))
+        if len(scope.top_posts) < self.top_n:
+            heapq.heappush(scope.top_posts, entry)
+        elif entry > scope.top_posts[0]:
+            heapq.heapreplace(scope.top_posts, entry)
+
+    def _render(self, scope: UserInsights):
+        by_change = lambda item: item[1][2]
+        gainers = [
+            {"keyword": k, "position": v[1], "change": v[2], "volume": v[3]}
+            for k, v in heapq.nlargest(self.top_n, scope.keywords.items(), key=by_change) if v[2] > 0
+        ]
+        decliners = [
+            {"keyword": k, "position": v[1], "change": v[2], "volume": v[3]}
+            for k, v in heapq.nsmallest(self.top_n, scope.keywords.items(), key=by_change) if v[2] < 0
+        ]
+
+        days = sorted(scope.sentiment_days)
+        daily = [scope.sentiment_days[day][0] / scope.sentiment_days[day][1] for day in days]
+        sentiment = None
+        if daily:
+            half = len(daily) // 2
+            earlier = sum(daily[:half]) / half if half else daily[0]
+            recent = sum(daily[half:]) / (len(daily) - half)
+            sentiment = {
+                "recent_average": round(recent, 3),
+                "previous_average": round(earlier, 3),
+                "trend": "up" if recent > earlier + 0.05 else "down" if recent < earlier - 0.05 else "flat",
+                "days": len(daily),
+            }
+
+        best_posts = [
+            {"platform": platform, "engagement": int(engagement), "content": content[:120]}
+            for engagement, _, platform, content in sorted(scope.top_posts, reverse=True)
+        ]
+
+        scope.summary = {
+            "keyword_gainers": gainers,
+            "keyword_decliners": decliners,
+            "sentiment": sentiment,
+            "best_posts": best_posts,
+        }
+
+        # Most useful facts first; stop adding lines at the token budget
+        lines = []
+        for item in gainers:
+            lines.append(f"- Keyword '{item['keyword']}' up {item['change']} to position {item['position']}")
+        for item in decliners:
+            lines.append(f"- Keyword '{item['keyword']}' down {-item['change']} to position {item['position']}")
+        if sentiment:
+            lines.append(
+                f"- Mention sentiment {sentiment['trend']}: {sentiment['recent_average']} "
+                f"vs {sentiment['previous_average']} over {sentiment['days']} days"
+            )
+        for post in best_posts:
+            lines.append(f"- Top {post['platform']} post ({post['engagement']} engagements): {post['content'][:80]}")
+
+        budget = self.max_tokens
+        kept = []
+        for line in lines:
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            kept.append(line)
+            budget -= cost
+        scope.text = "\n".join(kept)
+
+    def get(self, user_id: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Rendered prompt text and structured summary for a user (falls back to shared data)"""
+        if not INSIGHTS_ENABLED:
+            return "", None
+        scope = self._scopes.get(user_id or GLOBAL_SCOPE) or self._scopes.get(GLOBAL_SCOPE)
+        if scope is None or not scope.text:
+            return "", None
+        return scope.text, scope.summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": INSIGHTS_ENABLED, "scopes": len(self._scopes), "max_tokens": self.max_tokens}
+
+
+data_insights = InsightsBuilder()
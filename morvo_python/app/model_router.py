@@ -0,0 +1,302 @@
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import openai
+
+from morvo_python.app.metrics import registry
+from morvo_python.app.resilience import CircuitOpenError, DeadlineExceeded
+from morvo_python.app.response_cache import detect_language
+
+logger = logging.getLogger(__name__)
+
+# Model routing settings; with routing off every prompt uses the "question" route
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+# JSON object overriding the defaults per prompt class, e.g.
+# {"plan": {"model": "gpt-4o", "max_tokens": 1500, "fallbacks": ["gpt-4o-mini"]}}
+MODEL_ROUTES = os.getenv("MODEL_ROUTES", "")
+# Prompts up to SHORT_PROMPT_WORDS words are short; from LONG_PROMPT_WORDS on they are planned like campaigns
+SHORT_PROMPT_WORDS = int(os.getenv("SHORT_PROMPT_WORDS", "12"))
+LONG_PROMPT_WORDS = int(os.getenv("LONG_PROMPT_WORDS", "120"))
+# Arabic answers take roughly this many times the tokens of the same answer in English
+ARABIC_TOKEN_FACTOR = float(os.getenv("ARABIC_TOKEN_FACTOR", "1.5"))
+# Largest per-request latency budget a client may ask for, in seconds
+MAX_LATENCY_BUDGET = float(os.getenv("MAX_LATENCY_BUDGET", "60"))
+
+GREETING = "greeting"
+SHORT = "short"
+QUESTION = "question"
+PLAN = "plan"
+
+# Every class stays on the baseline model and token cap; larger models are opted into through MODEL_ROUTES
+DEFAULT_ROUTES: Dict[str, Dict[str, Any]] = {
+    GREETING: {"model": "gpt-3.5-turbo", "max_tokens": 150, "temperature": 0.7, "timeout": 8},
+    SHORT: {"model": "gpt-3.5-turbo", "max_tokens": 300, "temperature": 0.7, "timeout": 12},
+    QUESTION: {"model": "gpt-3.5-turbo", "max_tokens": 500, "temperature": 0.7, "timeout": 20},
+    PLAN: {"model": "gpt-3.5-turbo", "max_tokens": 500, "temperature": 0.7, "timeout": 20},
+}
+
+GREETING_WORDS = {
+    "hi", "hello", "hey", "hiya", "yo", "thanks", "thank", "thx", "bye", "goodbye", "morning", "evening",
+    "مرحبا", "مرحباً", "اهلا", "أهلا", "أهلاً", "هلا", "السلام", "سلام", "شكرا", "شكراً", "صباح", "مساء",
+}
+# Requests for a plan rather than everyday marketing vocabulary, which nearly every prompt contains.
+# English keywords match whole words; Arabic ones anywhere, since articles and suffixes attach to the word
+PLAN_KEYWORDS = re.compile(
+    r"\b(plans?|planning|strateg(y|ies|ic)|roadmaps?|go-to-market|forecasts?|"
+    r"content calendar|step[- ]by[- ]step)\b"
+)
+PLAN_KEYWORDS_AR = ("خطة", "خطط", "استراتيجي", "إستراتيجي", "خارطة طريق")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+routed_prompts = registry.counter(
+    "morvo_model_routed_total", "Chat prompts by routed prompt class and model", ["prompt_class", "model"]
+)
+model_fallbacks = registry.counter(
+    "morvo_model_fallbacks_total", "Completions moved to the next model in the chain", ["model", "reason"]
+)
+
+
+def classify_prompt(message: str) -> str:
+    """Bucket a prompt by length and intent keywords; no model call involved"""
+    text = message.strip().lower()
+    words = _WORD.findall(text)
+    if (
+        len(words) >= LONG_PROMPT_WORDS
+        or PLAN_KEYWORDS.search(text)
+        or any(keyword in text for keyword in PLAN_KEYWORDS_AR)
+    ):
+        return PLAN
+    if len(words) <= 4 and (not words or words[0] in GREETING_WORDS):
+        return GREETING
+    if len(words) <= SHORT_PROMPT_WORDS:
+        return SHORT
+    return QUESTION
+
+
+def should_fall_back(error: BaseException) -> bool:
+    """Slow, over-quota, unavailable or unknown models are worth trying the next model for"""
+    return isinstance(error, (
+        asyncio.TimeoutError,
+        CircuitOpenError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.NotFoundError,
+        openai.PermissionDeniedError,
+    ))
+
+
+def _fallback_reason(error: BaseException) -> str:
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, (openai.NotFoundError, openai.PermissionDeniedError)):
+        return "unavailable"
+    return "error"
+
+
+class Route:
+    """Model, token cap, temperature and timeout for one prompt, plus the models to fall back to in order"""
+
+    def __init__(
+        self,
+        prompt_class: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        timeout: float,
+        fallbacks: Optional[List[str]] = None,
+        language: str = "en",
+        budget: Optional[float] = None,
+    ):
+        self.prompt_class = prompt_class
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.timeout = timeout
+        self.fallbacks = [name for name in (fallbacks or []) if name != model]
+        self.language = language
+        self.budget = budget
+        # Model a stream's answer came from, set once it produces its first token
+        self.served_model: Optional[str] = None
+
+    @property
+    def models(self) -> List[str]:
+        return [self.model] + self.fallbacks
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "timeout": self.timeout,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class ModelRouter:
+    """Picks a model per prompt and runs completions along its fallback chain.
+
+    A per-request latency budget caps the time spent across the whole chain,
+    and models whose recent completions took longer than the budget are
+    skipped in favour of faster fallbacks.
+    """
+
+    def __init__(self, routes: Dict[str, Dict[str, Any]], enabled: bool = True):
+        self.enabled = enabled
+        self.routes: Dict[str, Route] = {}
+        for prompt_class, settings in routes.items():
+            self.routes[prompt_class] = Route(
+                prompt_class,
+                settings["model"],
+                int(settings.get("max_tokens", 500)),
+                float(settings.get("temperature", 0.7)),
+                float(settings.get("timeout", 30)),
+                settings.get("fallbacks"),
+            )
+        self.routed: Dict[str, int] = {name: 0 for name in self.routes}
+        self.fallbacks = 0
+        self.skipped_for_budget = 0
+        # Exponentially weighted completion latency per model, seconds
+        self.latency: Dict[str, float] = {}
+
+    def route(self, message: str, latency_budget: Optional[float] = None) -> Route:
+        """Route for this prompt, with the token cap adjusted for its language"""
+        prompt_class = classify_prompt(message) if self.enabled else QUESTION
+        base = self.routes.get(prompt_class) or self.routes[QUESTION]
+        language = detect_language(message)
+        max_tokens = base.max_tokens
+        if language == "ar" and self.enabled:
+            max_tokens = int(max_tokens * ARABIC_TOKEN_FACTOR)
+        budget = min(latency_budget, MAX_LATENCY_BUDGET) if latency_budget and latency_budget > 0 else None
+        self.routed[base.prompt_class] += 1
+        routed_prompts.inc(base.prompt_class, base.model)
+        return Route(
+            base.prompt_class, base.model, max_tokens, base.temperature, base.timeout,
+            base.fallbacks, language, budget,
+        )
+
+    def _candidates(self, route: Route) -> List[str]:
+        """The chain minus models currently too slow for the budget, keeping at least the last one"""
+        if not route.budget:
+            return route.models
+        models = [model for model in route.models if self.latency.get(model, 0.0) <= route.budget]
+        if len(models) < len(route.models):
+            self.skipped_for_budget += 1
+        return models or route.models[-1:]
+
+    def _observe(self, model: str, elapsed: float):
+        previous = self.latency.get(model)
+        self.latency[model] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+
+    def _deadline(self, route: Route, expires: Optional[float], next_model: Optional[str] = None) -> float:
+        """Time for one model: its route timeout, within the budget less what the next model usually needs"""
+        if expires is None:
+            return route.timeout
+        remaining = expires - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Latency budget of {route.budget:g}s exceeded")
+        reserve = self.latency.get(next_model, 0.0) if next_model else 0.0
+        if reserve < remaining:
+            remaining -= reserve
+        return min(route.timeout, remaining)
+
+    def _fell_back(self, model: str, next_model: str, error: BaseException):
+        self.fallbacks += 1
+        model_fallbacks.inc(model, _fallback_reason(error))
+        logger.warning(f"{model} failed ({type(error).__name__}: {error}); falling back to {next_model}")
+
+    def _expires(self, route: Route) -> Optional[float]:
+        return asyncio.get_running_loop().time() + route.budget if route.budget else None
+
+    async def complete(self, route: Route, call: Callable[[str, float], Awaitable[Any]]) -> Tuple[Any, str]:
+        """Run call(model, deadline) on each model in turn until one answers; returns (result, model)"""
+        expires = self._expires(route)
+        models = self._candidates(route)
+        for index, model in enumerate(models):
+            next_model = models[index + 1] if index + 1 < len(models) else None
+            deadline = self._deadline(route, expires, next_model)
+            started = time.perf_counter()
+            try:
+                result = await call(model, deadline)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    # The time a model was given before timing out is a lower bound on its latency
+                    self._observe(model, time.perf_counter() - started)
+                if next_model is None or not should_fall_back(e):
+                    raise
+                self._fell_back(model, next_model, e)
+                continue
+            self._observe(model, time.perf_counter() - started)
+            return result, model
+
+    async def stream(self, route: Route, open_stream: Callable[[str, float], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Stream from each model in turn until one produces a first token.
+
+        Once tokens have been sent a failure ends the answer; only the wait
+        for the first token can move on to a fallback model.
+        """
+        expires = self._expires(route)
+        models = self._candidates(route)
+        for index, model in enumerate(models):
+            next_model = models[index + 1] if index + 1 < len(models) else None
+            started = time.perf_counter()
+            tokens = open_stream(model, self._deadline(route, expires, next_model))
+            try:
+                try:
+                    first = await tokens.__anext__()
+                except StopAsyncIteration:
+                    return
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._observe(model, time.perf_counter() - started)
+                    if next_model is None or not should_fall_back(e):
+                        raise
+                    self._fell_back(model, next_model, e)
+                    continue
+                route.served_model = model
+                yield first
+                async for token in tokens:
+                    yield token
+                self._observe(model, time.perf_counter() - started)
+                return
+            finally:
+                await tokens.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "routes": {name: route.settings() for name, route in self.routes.items()},
+            "routed": dict(self.routed),
+            "fallbacks": self.fallbacks,
+            "skipped_for_budget": self.skipped_for_budget,
+            "latency_seconds": {model: round(value, 3) for model, value in self.latency.items()},
+        }
+
+
+def load_routes() -> Dict[str, Dict[str, Any]]:
+    """DEFAULT_ROUTES with MODEL_ROUTES applied on top, class by class"""
+    routes = {name: dict(settings) for name, settings in DEFAULT_ROUTES.items()}
+    if MODEL_ROUTES:
+        try:
+            overrides = json.loads(MODEL_ROUTES)
+            for name, settings in overrides.items():
+                if name not in routes:
+                    logger.error(f"MODEL_ROUTES names unknown prompt class {name!r}; use one of {', '.join(routes)}")
+                    continue
+                routes[name].update(settings)
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.error(f"Invalid MODEL_ROUTES, using the default routes: {e}")
+    return routes
+
+
+model_router = ModelRouter(load_routes(), enabled=MODEL_ROUTING_ENABLED)
@@ -3,13 +3,85 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 class ChatMessage(BaseModel):
-    message: str
-    user_id: Optional[str] = None
+    message: str = ""
+    user_id: Optional[str] = "anonymous"
+    session_id: Optional[str] = None
+    stream: Optional[bool] = None
+    # Seconds the client is willing to wait for the answer; slow models are skipped or cut off
+    latency_budget: Optional[float] = None
+
+class ChatBatchItem(BaseModel):
+    message: str = ""
+    id: Optional[str] = None
+    session_id: Optional[str] = None
+    latency_budget: Optional[float] = None
+
+class ChatBatchRequest(BaseModel):
+    items: List[ChatBatchItem]
+    user_id: Optional[str] = "anonymous"
+    max_parallel: Optional[int] = None
+    # Default for items that do not set their own
+    latency_budget: Optional[float] = None
 
 class ChatResponse(BaseModel):
     response: str
+    status: str
     timestamp: datetime
     data_insights: Optional[Dict[str, Any]] = None
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+    assistant: Optional[str] = None
+    endpoint: Optional[str] = None
+    error: Optional[str] = None
+
+class TablePage(BaseModel):
+    status: str
+    count: int
+    data: List[Dict[str, Any]]
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+
+class SearchRequest(BaseModel):
+    query: str = ""
+    tables: Optional[List[str]] = None
+    limit: int = 10
+    offset: int = 0
+    filters: Optional[Dict[str, Dict[str, Any]]] = None
+
+class SearchResponse(BaseModel):
+    status: str
+    query: str
+    engine: str
+    results: Dict[str, List[Dict[str, Any]]]
+    totals: Dict[str, Optional[int]]
+    total_results: int
+    limit: int
+    offset: int
+    # Tables whose search failed, with the reason; the others are still returned
+    errors: Optional[Dict[str, str]] = None
+    timestamp: datetime
+
+class CacheInvalidation(BaseModel):
+    # Either an explicit table list or a Supabase database webhook payload (which names one table)
+    tables: Optional[List[str]] = None
+    table: Optional[str] = None
+
+class IngestResult(BaseModel):
+    status: str
+    table: str
+    rows_received: int
+    rows_written: int
+    rows_rejected: int
+    rows_failed: int
+    # Rows in chunks an earlier attempt with the same Idempotency-Key already wrote
+    rows_skipped: int = 0
+    chunks_written: int
+    errors: List[Dict[str, Any]]
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
+    replayed: Optional[bool] = None
+    timestamp: datetime
 
 class DashboardData(BaseModel):
     seo_summary: Dict[str, Any]
@@ -0,0 +1,253 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional, List, Dict, AsyncIterator
+
+import httpx
+import openai
+
+from morvo_python.app.metrics import record_openai
+from morvo_python.app.resilience import CircuitOpenError, Upstream, register_upstream
+from morvo_python.app.tracing import span, SPAN_KIND_CLIENT
+
+logger = logging.getLogger(__name__)
+
+# Async completion engine settings
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "64"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_REQUEST_TIMEOUT = float(os.getenv("OPENAI_REQUEST_TIMEOUT", "30"))
+OPENAI_QUEUE_TIMEOUT = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "10"))
+# Resilience: total deadline across retries, attempts, backoff and circuit breaker
+OPENAI_DEADLINE = float(os.getenv("OPENAI_DEADLINE", "45"))
+OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", "2"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "0.5"))
+OPENAI_BACKOFF_CAP = float(os.getenv("OPENAI_BACKOFF_CAP", "4"))
+OPENAI_BREAKER_THRESHOLD = int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5"))
+OPENAI_BREAKER_RESET = float(os.getenv("OPENAI_BREAKER_RESET", "30"))
+
+# Shared client, connection pool and concurrency limit for all chat handlers
+async_client: Optional[openai.AsyncOpenAI] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+_in_flight = 0
+
+
+_STREAM_END = object()
+
+
+class CompletionQueueTimeout(Exception):
+    """Raised when a completion waits too long for a free concurrency slot"""
+
+
+def _outcome(error: Exception) -> str:
+    """Metrics label for a failed completion"""
+    if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    return "error"
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Connection problems, timeouts, 429s and 5xx are worth retrying; other API errors are not"""
+    return isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError))
+
+
+_model_upstreams: Dict[str, Upstream] = {}
+
+
+def model_upstream(model: str) -> Upstream:
+    """Retries and circuit breaker for one model, so a model over its quota does not block its fallbacks"""
+    upstream = _model_upstreams.get(model)
+    if upstream is None:
+        upstream = _model_upstreams[model] = register_upstream(Upstream(
+            f"openai:{model}",
+            _is_transient,
+            attempt_timeout=OPENAI_REQUEST_TIMEOUT,
+            deadline=OPENAI_DEADLINE,
+            max_attempts=OPENAI_MAX_ATTEMPTS,
+            backoff_base=OPENAI_BACKOFF_BASE,
+            backoff_cap=OPENAI_BACKOFF_CAP,
+            failure_threshold=OPENAI_BREAKER_THRESHOLD,
+            reset_timeout=OPENAI_BREAKER_RESET,
+        ))
+    return upstream
+
+
+def get_async_openai_client() -> Optional[openai.AsyncOpenAI]:
+    """Get the shared async OpenAI client with a pooled HTTP transport"""
+    global async_client, _http_client
+    if async_client is None and OPENAI_API_KEY:
+        try:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(OPENAI_REQUEST_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+            )
+            async_client = openai.AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                base_url=OPENAI_BASE_URL or None,
+                http_client=_http_client,
+                max_retries=0,
+            )
+            logger.info(
+                f"Async OpenAI client initialized (max_concurrency={OPENAI_MAX_CONCURRENCY}, "
+                f"max_connections={OPENAI_MAX_CONNECTIONS})"
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize async OpenAI client: {e}")
+            async_client = None
+    return async_client
+
+
+async def _acquire_slot():
+    """Wait for a free concurrency slot, bounded by the queue timeout"""
+    try:
+        await asyncio.wait_for(_semaphore.acquire(), timeout=OPENAI_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise CompletionQueueTimeout(
+            f"No completion slot free after {OPENAI_QUEUE_TIMEOUT}s "
+            f"({OPENAI_MAX_CONCURRENCY} requests in flight)"
+        )
+
+
+async def create_chat_completion(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-3.5-turbo",
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+):
+    """Run a chat completion under the shared concurrency limit and a per-request timeout.
+
+    deadline bounds the whole call including retries (OPENAI_DEADLINE by default).
+    """
+    global _in_flight
+    client = get_async_openai_client()
+    if client is None:
+        raise RuntimeError("OpenAI client is not configured")
+
+    with span("openai chat.completions", SPAN_KIND_CLIENT, **{"llm.model": model}) as current:
+        with span("openai queue_wait"):
+            await _acquire_slot()
+        _in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await model_upstream(model).call(lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout or OPENAI_REQUEST_TIMEOUT,
+            ), deadline=deadline)
+            record_openai(model, "completion", started, "ok", usage=response.usage)
+            if response.usage is not None:
+                current.set_attribute("llm.prompt_tokens", response.usage.prompt_tokens)
+                current.set_attribute("llm.completion_tokens", response.usage.completion_tokens)
+            return response
+        except Exception as e:
+            record_openai(model, "completion", started, _outcome(e))
+            raise
+        finally:
+            _in_flight -= 1
+            _semaphore.release()
+
+
+async def stream_chat_completion(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-3.5-turbo",
+    max_tokens: int = 500,
+    temperature: float = 0.7,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """Yield completion tokens as they arrive; closing the generator aborts the upstream request"""
+    global _in_flight
+    client = get_async_openai_client()
+    if client is None:
+        raise RuntimeError("OpenAI client is not configured")
+
+    await _acquire_slot()
+    _in_flight += 1
+    # The upstream read runs in its own task so that a client disconnect cancels it
+    # with a plain task.cancel(), which lets httpcore close the connection cleanly.
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        started = time.perf_counter()
+        deltas = 0
+        with span("openai chat.completions stream", SPAN_KIND_CLIENT, **{"llm.model": model}) as current:
+            try:
+                # Only opening the stream is retried; once tokens flow a failure ends the answer
+                stream = await model_upstream(model).call(lambda: client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout or OPENAI_REQUEST_TIMEOUT,
+                    stream=True,
+                ), deadline=deadline)
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        deltas += 1
+                        queue.put_nowait(token)
+                record_openai(model, "stream", started, "ok", completion_tokens=deltas)
+                queue.put_nowait(_STREAM_END)
+            except asyncio.CancelledError:
+                record_openai(model, "stream", started, "cancelled", completion_tokens=deltas)
+                raise
+            except Exception as e:
+                record_openai(model, "stream", started, _outcome(e), completion_tokens=deltas)
+                current.set_error(e)
+                queue.put_nowait(e)
+            finally:
+                current.set_attribute("llm.stream_deltas", deltas)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+        _in_flight -= 1
+        _semaphore.release()
+
+
+def get_completion_stats() -> Dict[str, int]:
+    """Current load on the completion engine"""
+    return {
+        "in_flight": _in_flight,
+        "max_concurrency": OPENAI_MAX_CONCURRENCY,
+        "max_connections": OPENAI_MAX_CONNECTIONS,
+    }
+
+
+async def close_openai_client():
+    """Close the pooled HTTP transport on shutdown"""
+    global async_client, _http_client
+    if _http_client is not None:
+        try:
+            await _http_client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing OpenAI HTTP client: {e}")
+    async_client = None
+    _http_client = None
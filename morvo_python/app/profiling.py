@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Profiling limits
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_MIN_INTERVAL = 0.001
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _stack(frame) -> List[str]:
+    """Outermost-first frame labels for one sample"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_thread(thread_id: int, seconds: float, interval: float) -> Dict[str, Any]:
+    """Sample one thread's Python stack at a fixed interval.
+
+    Runs in its own thread, so the sampled event loop keeps serving requests
+    while it is being profiled; time spent idle in the selector shows up as
+    its own stack.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running")
+    try:
+        stacks: Counter = Counter()
+        functions: Counter = Counter()
+        leaves: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stack = _stack(frame)
+                stacks[";".join(stack)] += 1
+                leaves[stack[-1]] += 1
+                for label in set(stack):
+                    functions[label] += 1
+                samples += 1
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+
+    return {
+        "samples": samples,
+        "interval_ms": interval * 1000,
+        "duration_s": seconds,
+        # Samples where the function was the one executing
+        "top_self": [
+            {"function": label, "samples": count, "percent": round(100 * count / samples, 2)}
+            for label, count in leaves.most_common(30)
+        ] if samples else [],
+        # Samples where the function was anywhere on the stack
+        "top_cumulative": [
+            {"function": label, "samples": count, "percent": round(100 * count / samples, 2)}
+            for label, count in functions.most_common(30)
+        ] if samples else [],
+        # Brendan Gregg's collapsed format, ready for flamegraph.pl or speedscope
+        "folded": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+    }
+
+
+async def profile_event_loop(seconds: float, interval: float) -> Dict[str, Any]:
+    """Time-boxed sampling profile of the thread running the current event loop"""
+    seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+    interval = max(PROFILE_MIN_INTERVAL, interval)
+    thread_id = threading.get_ident()
+    logger.info(f"Profiling event loop for {seconds}s at {interval * 1000:.1f}ms")
+    return await asyncio.to_thread(sample_thread, thread_id, seconds, interval)
+
+
+def dump_tasks(limit: int = 500, stack_depth: int = 10) -> Dict[str, Any]:
+    """Snapshot of every asyncio task with the coroutine stack it is suspended in"""
+    tasks = []
+    all_tasks = asyncio.all_tasks()
+    for task in list(all_tasks)[:limit]:
+        coro = task.get_coro()
+        stack = task.get_stack(limit=stack_depth)
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "cancelling": task.cancelling() if hasattr(task, "cancelling") else None,
+            "stack": [_frame_label(frame) for frame in stack],
+        })
+    by_coroutine = Counter(task["coroutine"] for task in tasks)
+    return {
+        "total": len(all_tasks),
+        "by_coroutine": dict(by_coroutine.most_common()),
+        "tasks": tasks,
+        "threads": [
+            {"name": thread.name, "daemon": thread.daemon, "alive": thread.is_alive()}
+            for thread in threading.enumerate()
+        ],
+    }
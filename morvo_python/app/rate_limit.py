@@ -0,0 +1,290 @@
+import os
+import math
+import time
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from morvo_python.app.shared_state import SharedBackend, get_shared_backend
+
+logger = logging.getLogger(__name__)
+
+# Rate limit settings (requests per minute with a burst allowance)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_USER_RPM = float(os.getenv("RATE_LIMIT_USER_RPM", "20"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "10"))
+RATE_LIMIT_IP_RPM = float(os.getenv("RATE_LIMIT_IP_RPM", "60"))
+RATE_LIMIT_IP_BURST = float(os.getenv("RATE_LIMIT_IP_BURST", "30"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Railway terminates TLS at a proxy, so the client address comes from X-Forwarded-For
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "true").lower() == "true"
+# Proxies in front of the app that append to X-Forwarded-For; hops left of theirs are client-supplied
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
+# Daily LLM tokens per user (0 disables the budget)
+DAILY_TOKEN_BUDGET = int(os.getenv("DAILY_TOKEN_BUDGET", "100000"))
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Token buckets keyed by caller; least recently seen callers are evicted past max_keys.
+
+    The local buckets only see this worker's traffic, so with several workers
+    a shared backend also counts each call in a per-minute window that allows
+    the same rate plus burst across all of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: float,
+        burst: float,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        backend: Optional[SharedBackend] = None,
+    ):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        self.backend = backend
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.backend_errors = 0
+
+    def check(self, key: str, cost: float = 1.0) -> Optional[float]:
+        """Take `cost` tokens; returns None when allowed, else seconds until it would be"""
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.burst, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            self.allowed += 1
+            return None
+        self.limited += 1
+        return (cost - bucket.tokens) / self.rate if self.rate > 0 else 60.0
+
+    async def acquire(self, key: str) -> Optional[float]:
+        """Local check first (a worker over the limit means the fleet is), then the shared window"""
+        retry_after = self.check(key)
+        if retry_after is not None or self.backend is None:
+            return retry_after
+        now = time.time()
+        try:
+            count = await self.backend.incr(f"morvo:ratelimit:{self.name}:{key}:{int(now // 60)}", 1, ttl=120)
+        except Exception as e:
+            # Fail open; the local bucket still applies
+            self.backend_errors += 1
+            logger.error(f"Rate limit backend error: {e}")
+            return None
+        if count > self.rate * 60 + self.burst:
+            self.allowed -= 1
+            self.limited += 1
+            return 60 - now % 60
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "per_minute": round(self.rate * 60, 2),
+            "burst": self.burst,
+            "tracked_keys": len(self.buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "backend": self.backend.name if self.backend else None,
+            "backend_errors": self.backend_errors,
+        }
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def seconds_until_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class TokenBudget:
+    """Daily LLM token allowance per caller.
+
+    Checks only read the local counters. With a shared backend, usage is added
+    there in the background and the returned total (which includes other
+    workers' usage) becomes the local view, so budgets converge across workers
+    without a round-trip on the request path.
+    """
+
+    def __init__(self, daily_tokens: int, backend: Optional[SharedBackend] = None, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.daily_tokens = daily_tokens
+        self.backend = backend
+        self.max_keys = max_keys
+        self.day = _utc_day()
+        self.used: "OrderedDict[str, int]" = OrderedDict()
+        self.exhausted = 0
+        self.backend_errors = 0
+
+    def _roll(self):
+        day = _utc_day()
+        if day != self.day:
+            self.day = day
+            self.used.clear()
+
+    def remaining(self, key: str) -> Optional[int]:
+        if self.daily_tokens <= 0:
+            return None
+        self._roll()
+        return max(0, self.daily_tokens - self.used.get(key, 0))
+
+    def check(self, key: str) -> Optional[float]:
+        """None when the caller still has budget, else seconds until it resets"""
+        remaining = self.remaining(key)
+        if remaining is None or remaining > 0:
+            return None
+        self.exhausted += 1
+        return seconds_until_utc_midnight()
+
+    def consume(self, key: str, tokens: int):
+        if self.daily_tokens <= 0 or tokens <= 0:
+            return
+        self._roll()
+        self.used[key] = self.used.get(key, 0) + tokens
+        self.used.move_to_end(key)
+        if len(self.used) > self.max_keys:
+            self.used.popitem(last=False)
+        if self.backend is not None:
+            asyncio.ensure_future(self._sync(key, tokens, self.day))
+
+    async def _sync(self, key: str, tokens: int, day: str):
+        try:
+            total = await self.backend.incr(f"morvo:budget:{day}:{key}", tokens, ttl=2 * 86400)
+            if day == self.day:
+                self.used[key] = max(self.used.get(key, 0), int(total))
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error(f"Token budget backend error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "daily_tokens": self.daily_tokens,
+            "day": self.day,
+            "tracked_keys": len(self.used),
+            "exhausted_rejections": self.exhausted,
+            "backend": self.backend.name if self.backend else None,
+            "backend_errors": self.backend_errors,
+        }
+
+
+def client_ip(headers: Dict[str, str], client: Optional[Tuple[str, int]]) -> str:
+    """The address the outermost trusted proxy saw.
+
+    Clients can send any X-Forwarded-For they like, so only the hops appended
+    by the RATE_LIMIT_TRUSTED_PROXIES proxies are read, counting from the right.
+    """
+    if RATE_LIMIT_TRUST_FORWARDED and RATE_LIMIT_TRUSTED_PROXIES > 0:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",")]
+            if len(hops) >= RATE_LIMIT_TRUSTED_PROXIES and hops[-RATE_LIMIT_TRUSTED_PROXIES]:
+                return hops[-RATE_LIMIT_TRUSTED_PROXIES]
+    return client[0] if client else "unknown"
+
+
+def caller_key(user_id: Optional[str], ip: str) -> str:
+    """Budget/rate key: the user when the client names one, otherwise the address.
+
+    user_id comes from the request body and is not authenticated, so a caller
+    can rotate it to get fresh per-user buckets and budgets; the per-address
+    limit, checked first, is the one that cannot be sidestepped that way.
+    """
+    if user_id and user_id != "anonymous":
+        return f"user:{user_id}"
+    return f"ip:{ip}"
+
+
+# Key and address of the caller being served, set once the limits pass so usage can be charged later
+_current_caller: contextvars.ContextVar = contextvars.ContextVar("morvo_rate_limit_caller", default=None)
+_current_ip: contextvars.ContextVar = contextvars.ContextVar("morvo_rate_limit_ip", default=None)
+
+
+user_limiter = RateLimiter("user", RATE_LIMIT_USER_RPM, RATE_LIMIT_USER_BURST, backend=get_shared_backend())
+ip_limiter = RateLimiter("ip", RATE_LIMIT_IP_RPM, RATE_LIMIT_IP_BURST, backend=get_shared_backend())
+token_budget = TokenBudget(DAILY_TOKEN_BUDGET, backend=get_shared_backend())
+
+
+async def check_chat_limits(user_id: Optional[str], ip: str) -> Optional[Tuple[str, float]]:
+    """(reason, retry_after seconds) when the call must be rejected, else None"""
+    if not RATE_LIMIT_ENABLED:
+        return None
+    key = caller_key(user_id, ip)
+    rejected = await _acquire(key, ip)
+    if rejected is None:
+        _current_caller.set(key)
+        _current_ip.set(ip)
+    return rejected
+
+
+async def check_more_chat_limits() -> Optional[Tuple[str, float]]:
+    """Count one more chat call (e.g. a further batch item) against the limits of the caller being served"""
+    key = _current_caller.get()
+    ip = _current_ip.get()
+    if not RATE_LIMIT_ENABLED or key is None or ip is None:
+        return None
+    return await _acquire(key, ip)
+
+
+async def _acquire(key: str, ip: str) -> Optional[Tuple[str, float]]:
+    retry_after = await ip_limiter.acquire(f"ip:{ip}")
+    if retry_after is not None:
+        return "Too many requests from this address", retry_after
+    if key.startswith("user:"):
+        retry_after = await user_limiter.acquire(key)
+        if retry_after is not None:
+            return "Too many requests for this user", retry_after
+    retry_after = token_budget.check(key)
+    if retry_after is not None:
+        return "Daily token budget exhausted", retry_after
+    return None
+
+
+def charge_tokens(tokens: int):
+    """Count LLM tokens against the budget of the caller being served"""
+    key = _current_caller.get()
+    if key is not None:
+        token_budget.consume(key, tokens)
+
+
+def check_token_budget() -> Optional[float]:
+    """Retry-after seconds once the caller being served has used up its daily token budget, else None"""
+    key = _current_caller.get()
+    if not RATE_LIMIT_ENABLED or key is None:
+        return None
+    return token_budget.check(key)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return {
+        "enabled": RATE_LIMIT_ENABLED,
+        "per_user": user_limiter.stats(),
+        "per_ip": ip_limiter.stats(),
+        "token_budget": token_budget.stats(),
+    }
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Access log settings
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() == "true"
+ACCESS_LOG_LEVEL = os.getenv("ACCESS_LOG_LEVEL", "INFO").upper()
+# Fraction of successful requests that are logged; warnings, errors and slow requests always are
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "2000"))
+# Minimum level per path prefix, e.g. "/health=WARNING,/api/chat=INFO"
+ACCESS_LOG_ROUTE_LEVELS = os.getenv("ACCESS_LOG_ROUTE_LEVELS", "/health=WARNING,/ping=WARNING")
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+# Chat message bodies are only written to logs when explicitly allowed
+LOG_MESSAGE_BODIES = os.getenv("LOG_MESSAGE_BODIES", "false").lower() == "true"
+
+REDACTED_QUERY_PARAMS = {"token", "key", "apikey", "api_key", "access_token", "password", "secret"}
+
+
+def redact_message(text: Any) -> str:
+    """User message as it may appear in logs"""
+    text = "" if text is None else str(text)
+    if LOG_MESSAGE_BODIES:
+        return text
+    return f"<redacted {len(text)} chars>"
+
+
+def parse_route_levels(spec: str) -> List[Tuple[str, int]]:
+    """Parse "prefix=LEVEL,..." into (prefix, level) pairs, longest prefix first"""
+    levels = []
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        prefix, level = (part.strip() for part in item.split("=", 1))
+        value = logging.getLevelName(level.upper())
+        if prefix and isinstance(value, int):
+            levels.append((prefix, value))
+        else:
+            logger.error(f"Ignoring invalid access log route level: {item}")
+    return sorted(levels, key=lambda pair: len(pair[0]), reverse=True)
+
+
+def redact_query(query_string: bytes) -> Optional[str]:
+    if not query_string:
+        return None
+    pairs = []
+    for pair in query_string.decode("latin-1").split("&"):
+        name, _, value = pair.partition("=")
+        pairs.append(f"{name}=***" if name.lower() in REDACTED_QUERY_PARAMS else pair)
+    return "&".join(pairs)
+
+
+class AccessLogWriter:
+    """Writes one JSON line per entry from a background thread.
+
+    Request handlers only put a dict on a bounded queue; encoding and stdout
+    I/O happen off the event loop, and entries are dropped (and counted)
+    rather than blocking when the writer falls behind.
+    """
+
+    def __init__(self, stream=None, max_queue: int = ACCESS_LOG_QUEUE_SIZE):
+        self.stream = stream or sys.stdout
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self.thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Flush queued entries and stop the writer thread"""
+        if self.thread is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        self.thread = None
+
+    def emit(self, entry: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            lines = []
+            # Drain whatever else is queued so bursts become a single write
+            while entry is not None:
+                lines.append(json.dumps(entry, ensure_ascii=False, default=str))
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                    self.written += len(lines)
+                except Exception:
+                    self.dropped += len(lines)
+            if entry is None:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": ACCESS_LOG_ENABLED,
+            "sample_rate": ACCESS_LOG_SAMPLE_RATE,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "queued": self.queue.qsize(),
+        }
+
+
+class AccessLogMiddleware:
+    """ASGI middleware that records method, path, status, bytes and latency per request"""
+
+    def __init__(
+        self,
+        app,
+        writer: Optional["AccessLogWriter"] = None,
+        sample_rate: float = ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = ACCESS_LOG_SLOW_MS,
+        route_levels: str = ACCESS_LOG_ROUTE_LEVELS,
+        min_level: str = ACCESS_LOG_LEVEL,
+    ):
+        self.app = app
+        self.writer = writer or access_log_writer
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.route_levels = parse_route_levels(route_levels)
+        level = logging.getLevelName(min_level)
+        self.min_level = level if isinstance(level, int) else logging.INFO
+
+    def route_level(self, path: str) -> int:
+        for prefix, level in self.route_levels:
+            if path.startswith(prefix):
+                return level
+        return self.min_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ACCESS_LOG_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.record(scope, state["status"], state["bytes"], (time.perf_counter() - started) * 1000)
+
+    def record(self, scope, status: int, size: int, duration_ms: float):
+        level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+        slow = duration_ms >= self.slow_ms
+        if slow:
+            level = max(level, logging.WARNING)
+        path = scope.get("path", "")
+        if level < self.route_level(path):
+            return
+        if level == logging.INFO and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.writer.sampled_out += 1
+            return
+
+        headers = dict(scope.get("headers") or [])
+        client = scope.get("client")
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "level": logging.getLevelName(level),
+            "method": scope.get("method"),
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "bytes": size,
+            "client": client[0] if client else None,
+        }
+        query = redact_query(scope.get("query_string", b""))
+        if query:
+            entry["query"] = query
+        if b"origin" in headers:
+            entry["origin"] = headers[b"origin"].decode("latin-1")
+        if slow:
+            entry["slow"] = True
+        if level > logging.INFO and b"user-agent" in headers:
+            entry["user_agent"] = headers[b"user-agent"].decode("latin-1")
+        if self.sample_rate < 1.0:
+            entry["sample_rate"] = self.sample_rate
+        self.writer.emit(entry)
+
+
+access_log_writer = AccessLogWriter()
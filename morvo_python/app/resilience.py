@@ -0,0 +1,267 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from morvo_python.app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+_CIRCUIT_STATE_VALUES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+upstream_retries = registry.counter(
+    "morvo_upstream_retries_total", "Upstream calls retried after a transient failure", ["upstream"]
+)
+upstream_hedges = registry.counter(
+    "morvo_upstream_hedged_total", "Hedged upstream requests by which attempt answered first", ["upstream", "winner"]
+)
+upstream_short_circuits = registry.counter(
+    "morvo_upstream_short_circuited_total", "Upstream calls rejected by an open circuit breaker", ["upstream"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} is unavailable (circuit open, retry in {retry_after:.1f}s)")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when an upstream call, including its retries, runs past its deadline"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures and fails fast until reset_timeout has passed.
+
+    Then a single probe call is let through (half-open); its outcome closes
+    the circuit or opens it for another reset_timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go ahead now"""
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if self.state == CIRCUIT_OPEN:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self._reject(remaining)
+            self.state = CIRCUIT_HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, probing")
+        if self.probe_in_flight:
+            self._reject(self.reset_timeout)
+        self.probe_in_flight = True
+
+    def _reject(self, retry_after: float):
+        self.short_circuited += 1
+        upstream_short_circuits.inc(self.name)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        self.probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.state != CIRCUIT_CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+            self.state = CIRCUIT_CLOSED
+
+    def record_failure(self):
+        self.probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures; "
+                f"failing fast for {self.reset_timeout:g}s"
+            )
+
+    def release(self):
+        """The call ended without saying anything about upstream health"""
+        self.probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+        if self.state == CIRCUIT_OPEN:
+            stats["retry_in"] = round(max(0.0, self.opened_at + self.reset_timeout - time.monotonic()), 2)
+        return stats
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given retry (1 = first retry)"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class Upstream:
+    """Deadlines, retries, a circuit breaker and optional hedging around calls to one upstream.
+
+    Timeouts and the errors `is_transient` accepts are retried and count
+    against the breaker; anything else (bad requests, local queue timeouts)
+    is raised straight away and leaves the breaker alone.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_transient: Callable[[BaseException], bool],
+        attempt_timeout: float,
+        deadline: float,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_cap: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        hedge_after: float = 0.0,
+    ):
+        self.name = name
+        self.is_transient = is_transient
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.calls = 0
+        self.retries = 0
+        self.hedged = 0
+        self.deadline_exceeded = 0
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        idempotent: bool = True,
+        hedge: bool = False,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Run fn() until it succeeds, fails permanently, or the deadline passes.
+
+        Only idempotent calls are retried or hedged.
+        """
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + (deadline or self.deadline)
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            remaining = expires - loop.time()
+            if remaining <= 0:
+                self.deadline_exceeded += 1
+                raise DeadlineExceeded(f"{self.name} deadline of {deadline or self.deadline:g}s exceeded")
+            self.breaker.before_call()
+            timeout = min(self.attempt_timeout, remaining)
+            try:
+                if hedge and idempotent and 0 < self.hedge_after < timeout:
+                    result = await self._hedged(fn, timeout)
+                else:
+                    result = await asyncio.wait_for(fn(), timeout=timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not (isinstance(e, asyncio.TimeoutError) or self.is_transient(e)):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                if attempt == attempts or loop.time() + delay >= expires:
+                    raise
+                self.retries += 1
+                upstream_retries.inc(self.name)
+                logger.warning(f"{self.name} call failed ({type(e).__name__}: {e}); retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        """Send a second copy of a slow request and take whichever answers first"""
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedged += 1
+        backup = asyncio.ensure_future(fn())
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            remaining = timeout - self.hedge_after
+            while pending:
+                started = time.monotonic()
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        upstream_hedges.inc(self.name, "primary" if task is primary else "hedge")
+                        return task.result()
+                    error = task.exception()
+                remaining -= time.monotonic() - started
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "deadline_exceeded": self.deadline_exceeded,
+            "attempt_timeout": self.attempt_timeout,
+            "deadline": self.deadline,
+            "max_attempts": self.max_attempts,
+            "hedge_after": self.hedge_after,
+        }
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def register_upstream(upstream: Upstream) -> Upstream:
+    _upstreams[upstream.name] = upstream
+    return upstream
+
+
+def resilience_stats() -> Dict[str, Any]:
+    return {name: upstream.stats() for name, upstream in _upstreams.items()}
+
+
+def collect_circuit_metrics():
+    """Breaker state per upstream (0 closed, 1 half-open, 2 open), read at scrape time"""
+    return [
+        ("morvo_upstream_circuit_state", "gauge", "Circuit breaker state: 0 closed, 1 half-open, 2 open", [
+            ("morvo_upstream_circuit_state", {"upstream": name}, _CIRCUIT_STATE_VALUES[upstream.breaker.state])
+            for name, upstream in _upstreams.items()
+        ]),
+    ]
+
+
+registry.register_collector(collect_circuit_metrics)
@@ -0,0 +1,176 @@
+import os
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
+
+from morvo_python.app.shared_state import SharedBackend, get_shared_backend
+
+logger = logging.getLogger(__name__)
+
+# Chat response cache settings
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() == "true"
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "5000"))
+CHAT_CACHE_MAX_BYTES = int(os.getenv("CHAT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+_WHITESPACE = re.compile(r"\s+")
+# Arabic script including its supplements and presentation forms
+_ARABIC = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+_LATIN = re.compile(r"[A-Za-z]")
+
+
+class TTLLRUCache:
+    """In-memory cache with per-entry TTL and LRU eviction by entry count and size"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, size = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, size: int, ttl: Optional[float] = None):
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def keys(self) -> list:
+        return list(self._entries)
+
+    def delete(self, key: Any):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Any):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a prompt so trivially different spellings share a cache entry"""
+    return _WHITESPACE.sub(" ", message).strip().casefold()
+
+
+def detect_language(message: str) -> str:
+    """Cheap language detection: 'ar' when most letters are Arabic, otherwise 'en'.
+
+    Shared by the cache key and the model router so both see the same language.
+    """
+    return "ar" if len(_ARABIC.findall(message)) > len(_LATIN.findall(message)) else "en"
+
+
+def make_chat_cache_key(message: str, model: str, system_prompt: str) -> str:
+    """Cache key over normalized message, language, model and system prompt"""
+    normalized = normalize_message(message)
+    raw = "\x1f".join([normalized, detect_language(message), model, system_prompt])
+    return "chat:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChatResponseCache:
+    """Local TTL/LRU cache with an optional shared backend behind it"""
+
+    def __init__(self, local: TTLLRUCache, backend: Optional[SharedBackend] = None, enabled: bool = True):
+        self.local = local
+        self.backend = backend
+        self.enabled = enabled
+        self.backend_hits = 0
+        self.backend_errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error(f"Chat cache backend get error: {e}")
+            return None
+        if raw is None:
+            return None
+        value = raw.decode("utf-8")
+        self.backend_hits += 1
+        self.local.set(key, value, len(raw))
+        return value
+
+    async def set(self, key: str, value: str):
+        if not self.enabled or not value:
+            return
+        raw = value.encode("utf-8")
+        self.local.set(key, value, len(raw))
+        if self.backend is not None:
+            try:
+                await self.backend.set(key, raw, ttl=self.local.ttl)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.error(f"Chat cache backend set error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats.update({
+            "enabled": self.enabled,
+            "backend": self.backend.name if self.backend else None,
+            "backend_hits": self.backend_hits,
+            "backend_errors": self.backend_errors,
+        })
+        return stats
+
+
+chat_cache = ChatResponseCache(
+    TTLLRUCache(CHAT_CACHE_MAX_ENTRIES, CHAT_CACHE_MAX_BYTES, CHAT_CACHE_TTL),
+    backend=get_shared_backend(),
+    enabled=CHAT_CACHE_ENABLED,
+)
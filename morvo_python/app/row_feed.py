@@ -0,0 +1,178 @@
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from morvo_python.app.supabase_client import DATA_TABLES, SUPABASE_KEYSET_TIEBREAKER, fetch_rows_after
+
+logger = logging.getLogger(__name__)
+
+# Incremental row feed settings
+ROW_FEED_ENABLED = os.getenv("ROW_FEED_ENABLED", "true").lower() == "true"
+ROW_FEED_INTERVAL = float(os.getenv("ROW_FEED_INTERVAL", "30"))
+ROW_FEED_BATCH_SIZE = int(os.getenv("ROW_FEED_BATCH_SIZE", "1000"))
+ROW_FEED_MAX_BACKOFF = float(os.getenv("ROW_FEED_MAX_BACKOFF", "300"))
+# Rows this worker wrote and published itself, remembered so the next poll does not publish them again
+ROW_FEED_WRITTEN_MEMORY = int(os.getenv("ROW_FEED_WRITTEN_MEMORY", "100000"))
+
+RowHandler = Callable[[str, List[Dict[str, Any]]], None]
+
+
+class RowFeed:
+    """Pulls rows newer than a per-table watermark and hands them to subscribers.
+
+    Subscribers (search index, summaries, aggregates) only ever see each row
+    once, so they can keep incremental state instead of rescanning tables.
+    """
+
+    def __init__(self, tables: Tuple[str, ...], interval: float, batch_size: int):
+        self.tables = tables
+        self.interval = interval
+        self.batch_size = batch_size
+        self._handlers: List[RowHandler] = []
+        self._watermarks: Dict[str, Optional[Tuple[str, Any]]] = {table: None for table in tables}
+        self._task: Optional[asyncio.Task] = None
+        self._locks = {table: asyncio.Lock() for table in tables}
+        self._pending_polls = set()
+        # Tables with an out-of-band poll waiting for the table lock
+        self._queued_polls = set()
+        self._written: "OrderedDict[Tuple[str, Any], None]" = OrderedDict()
+        self.synced = asyncio.Event()
+        self.rows_seen = {table: 0 for table in tables}
+        self.last_error: Optional[str] = None
+
+    def subscribe(self, handler: RowHandler):
+        self._handlers.append(handler)
+
+    def publish(self, table: str, rows: List[Dict[str, Any]]):
+        """Dispatch rows to every subscriber"""
+        if not rows:
+            return
+        self.rows_seen[table] = self.rows_seen.get(table, 0) + len(rows)
+        for handler in self._handlers:
+            try:
+                handler(table, rows)
+            except Exception as e:
+                logger.error(f"Row feed handler error for {table}: {e}")
+
+    def publish_written(self, table: str, rows: List[Dict[str, Any]]):
+        """Publish rows this worker just inserted, whatever their created_at, oldest first.
+
+        Backfilled rows older than the watermark are never pulled by a poll, so
+        writers hand them over directly; new rows that a poll reads later are
+        skipped there. Only newly inserted rows belong here: subscribers keep
+        running totals and would count an updated row twice.
+        """
+        if self._task is None or not rows:
+            return
+        rows = sorted(rows, key=lambda row: (str(row.get("created_at") or ""), str(row.get(SUPABASE_KEYSET_TIEBREAKER))))
+        for row in rows:
+            key = row.get(SUPABASE_KEYSET_TIEBREAKER)
+            if key is not None:
+                self._written[(table, key)] = None
+                self._written.move_to_end((table, key))
+        while len(self._written) > ROW_FEED_WRITTEN_MEMORY:
+            self._written.popitem(last=False)
+        self.publish(table, rows)
+
+    def _already_published(self, table: str, row: Dict[str, Any]) -> bool:
+        key = (table, row.get(SUPABASE_KEYSET_TIEBREAKER))
+        if key in self._written:
+            del self._written[key]
+            return True
+        return False
+
+    async def poll_table(self, table: str) -> int:
+        """Pull every row past the table's watermark, one batch at a time"""
+        async with self._locks[table]:
+            return await self._pull(table)
+
+    async def _pull(self, table: str) -> int:
+        pulled = 0
+        while True:
+            rows = await fetch_rows_after(table, self._watermarks[table], self.batch_size)
+            if not rows:
+                break
+            last = rows[-1]
+            self._watermarks[table] = (last.get("created_at"), last.get(SUPABASE_KEYSET_TIEBREAKER))
+            batch = len(rows)
+            if self._written:
+                rows = [row for row in rows if not self._already_published(table, row)]
+            self.publish(table, rows)
+            pulled += batch
+            if batch < self.batch_size:
+                break
+        return pulled
+
+    def poll_soon(self, tables: List[str]):
+        """Pull new rows now instead of waiting for the next interval (e.g. after a write).
+
+        Calls that arrive while a poll of the table is still waiting to start
+        share it, so a burst of calls costs at most one poll in flight and one queued.
+        """
+        if self._task is None:
+            return
+        for table in tables:
+            if table in self._locks and table not in self._queued_polls:
+                self._queued_polls.add(table)
+                task = asyncio.ensure_future(self._poll_queued(table))
+                self._pending_polls.add(task)
+                task.add_done_callback(self._pending_polls.discard)
+
+    async def _poll_queued(self, table: str):
+        try:
+            async with self._locks[table]:
+                # Calls from here on need a fresh poll: this one may already have read past their rows
+                self._queued_polls.discard(table)
+                await self._pull(table)
+        except Exception as e:
+            logger.error(f"Row feed poll error for {table}: {e}")
+        finally:
+            self._queued_polls.discard(table)
+
+    async def poll_once(self) -> int:
+        results = await asyncio.gather(*(self.poll_table(table) for table in self.tables))
+        return sum(results)
+
+    async def _run(self):
+        delay = self.interval
+        while True:
+            try:
+                pulled = await self.poll_once()
+                if not self.synced.is_set():
+                    self.synced.set()
+                    logger.info(f"Row feed initial sync complete ({pulled} rows)")
+                self.last_error = None
+                delay = self.interval
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Row feed poll error: {e}")
+                delay = min(delay * 2, ROW_FEED_MAX_BACKOFF)
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None and ROW_FEED_ENABLED:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Row feed started (interval={self.interval}s, tables={list(self.tables)})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "synced": self.synced.is_set(),
+            "rows_seen": dict(self.rows_seen),
+            "watermarks": {table: mark[0] if mark else None for table, mark in self._watermarks.items()},
+            "last_error": self.last_error,
+        }
+
+
+row_feed = RowFeed(DATA_TABLES, ROW_FEED_INTERVAL, ROW_FEED_BATCH_SIZE)
@@ -0,0 +1,201 @@
+import os
+import re
+import math
+import heapq
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Search index settings
+SEARCH_MAX_DOCS_PER_TABLE = int(os.getenv("SEARCH_MAX_DOCS_PER_TABLE", "1000000"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+
+# Text fields indexed per table
+SEARCH_FIELDS = {
+    "seo_signals": ("keyword", "url"),
+    "mentions": ("text", "source"),
+    "posts": ("content", "platform"),
+}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+# Harakat, superscript alef and tatweel
+_ARABIC_DIACRITICS = re.compile(r"[\u064B-\u0652\u0670\u0640]")
+# Hamza/madda alef forms -> bare alef, alef maqsura -> yeh, teh marbuta -> heh, hamza carriers -> base letter
+_ARABIC_LETTER_FORMS = str.maketrans({
+    "\u0623": "\u0627", "\u0625": "\u0627", "\u0622": "\u0627",
+    "\u0649": "\u064A", "\u0629": "\u0647", "\u0624": "\u0648", "\u0626": "\u064A",
+})
+# Definite article, alone or after wa/bi/ka/fa
+_ARABIC_PREFIXES = ("\u0648\u0627\u0644", "\u0628\u0627\u0644", "\u0643\u0627\u0644", "\u0641\u0627\u0644", "\u0627\u0644")
+
+
+def normalize_token(token: str) -> str:
+    """Fold Arabic letter variants and light English/Arabic affixes"""
+    if token.isascii():
+        if len(token) >= 3 and token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+        return token
+    token = token.translate(_ARABIC_LETTER_FORMS)
+    for prefix in _ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            return token[len(prefix):]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Split Arabic and English text into normalized search terms"""
+    tokens = []
+    # Diacritics are combining marks that \w does not match, so strip them before splitting
+    for raw in _TOKEN.findall(_ARABIC_DIACRITICS.sub("", text).casefold()):
+        token = normalize_token(raw)
+        if len(token) >= 2:
+            tokens.append(token)
+    return tokens
+
+
+def document_id(row: Dict[str, Any]) -> Any:
+    if row.get("id") is not None:
+        return row["id"]
+    return (row.get("created_at"), tuple(sorted((k, str(v)) for k, v in row.items())))
+
+
+class TableIndex:
+    """Inverted index with BM25 ranking over one table's text fields"""
+
+    def __init__(self, fields: Tuple[str, ...], max_docs: int):
+        self.fields = fields
+        self.max_docs = max_docs
+        self.rows: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self.doc_terms: Dict[Any, Dict[str, int]] = {}
+        self.doc_lengths: Dict[Any, int] = {}
+        self.postings: Dict[str, Dict[Any, int]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, row: Dict[str, Any]):
+        doc_id = document_id(row)
+        if doc_id in self.rows:
+            self.remove(doc_id)
+        text = " ".join(str(row[field]) for field in self.fields if row.get(field) is not None)
+        terms: Dict[str, int] = {}
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + 1
+        self.rows[doc_id] = row
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for token, tf in terms.items():
+            self.postings.setdefault(token, {})[doc_id] = tf
+        # Oldest documents fall out once the table reaches its cap
+        while len(self.rows) > self.max_docs:
+            self.remove(next(iter(self.rows)))
+
+    def remove(self, doc_id: Any):
+        self.rows.pop(doc_id, None)
+        terms = self.doc_terms.pop(doc_id, {})
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        for token in terms:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[token]
+
+    def search(
+        self,
+        terms: List[str],
+        filters: Optional[Dict[str, Any]],
+        limit: int,
+        offset: int,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Rank documents matching every query term; returns (page, total matches)"""
+        postings = [self.postings.get(term) for term in dict.fromkeys(terms)]
+        if not postings or any(posting is None for posting in postings):
+            return [], 0
+        # Intersect starting from the rarest term so work tracks the smallest posting list
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return [], 0
+        if filters:
+            candidates = {
+                doc_id for doc_id in candidates
+                if all(self.rows[doc_id].get(field) == value for field, value in filters.items())
+            }
+
+        doc_count = len(self.rows)
+        avg_length = self.total_length / doc_count if doc_count else 1.0
+        idf = [math.log(1 + (doc_count - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+
+        def score(doc_id: Any) -> float:
+            length = self.doc_lengths[doc_id]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            total = 0.0
+            for weight, posting in zip(idf, postings):
+                tf = posting[doc_id]
+                total += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            return total
+
+        ranked = heapq.nlargest(
+            offset + limit,
+            ((score(doc_id), doc_id) for doc_id in candidates),
+            key=lambda item: item[0],
+        )
+        page = [
+            {**self.rows[doc_id], "_score": round(doc_score, 4)}
+            for doc_score, doc_id in ranked[offset:offset + limit]
+        ]
+        return page, len(candidates)
+
+
+class SearchIndex:
+    """Per-table inverted indexes kept current by the row feed"""
+
+    def __init__(self, max_docs_per_table: int = SEARCH_MAX_DOCS_PER_TABLE):
+        self.tables = {table: TableIndex(fields, max_docs_per_table) for table, fields in SEARCH_FIELDS.items()}
+
+    def add_rows(self, table: str, rows: List[Dict[str, Any]]):
+        index = self.tables.get(table)
+        if index is None:
+            return
+        for row in rows:
+            index.add(row)
+
+    def search(
+        self,
+        query: str,
+        tables: List[str],
+        limit: int = 10,
+        offset: int = 0,
+        filters: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        terms = tokenize(query)
+        limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        results = {}
+        for table in tables:
+            index = self.tables.get(table)
+            if index is None:
+                continue
+            page, total = index.search(terms, (filters or {}).get(table), limit, offset)
+            results[table] = {"data": page, "total": total}
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            table: {"documents": len(index), "terms": len(index.postings)}
+            for table, index in self.tables.items()
+        }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,150 @@
+import os
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted outside the streaming upload routes
+MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", str(1024 * 1024)))
+# Path prefixes that stream their bodies and enforce their own limits
+REQUEST_BODY_LIMIT_EXEMPT = tuple(
+    prefix for prefix in os.getenv("REQUEST_BODY_LIMIT_EXEMPT", "/api/ingest/").split(",") if prefix
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    class FastJSONResponse(JSONResponse):
+        """JSON response rendered by orjson: several times faster than json.dumps on large row lists"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(
+                content,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z,
+            )
+else:
+    logger.warning("orjson not installed, falling back to the standard JSON encoder")
+    FastJSONResponse = JSONResponse
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Render content directly, skipping FastAPI's jsonable_encoder pass over the payload.
+
+    Use for payloads that are already plain JSON types, such as PostgREST rows.
+    """
+    return FastJSONResponse(content, status_code=status_code)
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a response model straight to JSON bytes in pydantic-core.
+
+    Only fields the handler set are written, so optional fields an endpoint
+    does not use stay out of its payload.
+    """
+    return Response(
+        model.model_dump_json(exclude_unset=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+# Timestamps change once a second, so both forms are built at most once a second
+_clock_second: Optional[int] = None
+_clock_now: Optional[datetime] = None
+_clock_text = ""
+
+
+def _tick():
+    global _clock_second, _clock_now, _clock_text
+    second = int(time.time())
+    if second != _clock_second:
+        _clock_second = second
+        _clock_now = datetime.fromtimestamp(second, timezone.utc)
+        _clock_text = _clock_now.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def utc_now() -> datetime:
+    """Current UTC time at one-second resolution"""
+    _tick()
+    return _clock_now
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix, e.g. 2025-08-10T12:06:00Z"""
+    _tick()
+    return _clock_text
+
+
+class BodySizeLimitMiddleware:
+    """ASGI middleware rejecting request bodies over max_bytes with 413.
+
+    Declared Content-Length is checked before the app runs; chunked bodies are
+    counted as they are read.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BODY_BYTES, exempt: tuple = REQUEST_BODY_LIMIT_EXEMPT):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.exempt = exempt
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0 or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > self.max_bytes
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    await self._reject(send)
+                    return
+                break
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, send_wrapper)
+        except HTTPException as e:
+            if e.status_code != 413 or started:
+                raise
+            await self._reject(send)
+
+    def _detail(self) -> str:
+        return f"Request body exceeds {self.max_bytes} bytes"
+
+    async def _reject(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": f'{{"detail":"{self._detail()}"}}'.encode()})
@@ -0,0 +1,165 @@
+import os
+import sys
+import math
+import logging
+from typing import Any, Dict, Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from morvo_python.app.shared_state import SHARED_STATE_URL
+
+logger = logging.getLogger(__name__)
+
+# Worker settings; WEB_CONCURRENCY is the conventional override, otherwise one worker per usable core
+WEB_CONCURRENCY = os.getenv("WEB_CONCURRENCY")
+WEB_MAX_WORKERS = int(os.getenv("WEB_MAX_WORKERS", "8"))
+# Seconds in-flight requests (including streaming chats) get to finish after SIGTERM;
+# keep it below the platform's kill deadline (drainingSeconds in railway.json)
+GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "25"))
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+# Proxy addresses whose X-Forwarded-For/Proto are applied to the request; "*" is unsafe with uvicorn 0.24,
+# which then takes the leftmost, client-supplied X-Forwarded-For hop as the client address
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU limit of the container, from cgroup v2 or v1, or None when unlimited"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Cores this process may actually use, honouring CPU affinity and container quotas"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        count = min(count, math.ceil(quota))
+    return max(1, count)
+
+
+def worker_count() -> int:
+    if WEB_CONCURRENCY:
+        try:
+            return max(1, int(WEB_CONCURRENCY))
+        except ValueError:
+            logger.error(f"Invalid WEB_CONCURRENCY {WEB_CONCURRENCY!r}, sizing workers to cores")
+    return min(available_cpus(), WEB_MAX_WORKERS)
+
+
+class DrainState:
+    """Whether this worker is shutting down, and the chat streams it is still serving"""
+
+    def __init__(self):
+        self.draining = False
+        self.active_streams = 0
+        self.streams_completed_while_draining = 0
+
+    def begin(self):
+        if not self.draining:
+            self.draining = True
+            logger.info(
+                f"Draining worker {os.getpid()}: {self.active_streams} chat stream(s) in flight, "
+                f"up to {GRACEFUL_SHUTDOWN_TIMEOUT:g}s to finish"
+            )
+
+    def stream_started(self):
+        self.active_streams += 1
+
+    def stream_finished(self):
+        self.active_streams -= 1
+        if self.draining:
+            self.streams_completed_while_draining += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "draining": self.draining,
+            "active_streams": self.active_streams,
+            "streams_completed_while_draining": self.streams_completed_while_draining,
+            "graceful_shutdown_timeout": GRACEFUL_SHUTDOWN_TIMEOUT,
+        }
+
+
+drain_state = DrainState()
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that marks the worker as draining as soon as a shutdown signal arrives.
+
+    uvicorn itself stops accepting connections, closes idle keep-alive ones and
+    waits up to timeout_graceful_shutdown for responses still being sent, so
+    streaming chats run to completion instead of being cut off by a redeploy.
+    """
+
+    def handle_exit(self, sig, frame):
+        drain_state.begin()
+        super().handle_exit(sig, frame)
+
+
+class DrainingSupervisor(Multiprocess):
+    """Signals every worker at once so they drain in parallel rather than one after another"""
+
+    def shutdown(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        logger.info(f"Stopped {len(self.processes)} worker(s)")
+
+
+def serve(app: str = "main:app", host: str = SERVER_HOST, port: Optional[int] = None, workers: Optional[int] = None):
+    """Run the app with one worker process per usable core behind a shared socket"""
+    port = port or int(os.environ.get("PORT", 8000))
+    workers = workers or worker_count()
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        # AccessLogMiddleware logs every request; uvicorn's own access line would duplicate it
+        access_log=False,
+        # Railway's proxy sets X-Forwarded-For/Proto
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+    )
+    if workers > 1 and not SHARED_STATE_URL.startswith(("redis://", "rediss://")):
+        logger.warning(
+            "Running several workers without a shared state backend: chat cache, rate limits, "
+            "token budgets and sessions are per worker. Set SHARED_STATE_URL=redis://... to share them."
+        )
+    server = DrainingServer(config)
+    logger.info(f"Starting server on {host}:{port} with {workers} worker(s)")
+    if workers > 1:
+        DrainingSupervisor(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+        if not server.started:
+            sys.exit(3)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # Go through the package module so workers share drain_state with the app
+    from morvo_python.app.server import serve as package_serve
+    package_serve()
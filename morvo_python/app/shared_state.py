@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Shared state backend, e.g. "memory://" or "redis://host:6379/0"
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "")
+
+
+class SharedBackend(ABC):
+    """Key/value store shared between workers (caches, counters, sessions)"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        ...
+
+    async def close(self):
+        pass
+
+
+class InMemoryBackend(SharedBackend):
+    """Process-local stand-in with the same interface as the shared backends"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = asyncio.Lock()
+
+    def _alive(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._alive(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, value)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        async with self._lock:
+            current = self._alive(key)
+            value = int(current or 0) + amount
+            expires_at = self._data[key][0] if current is not None else (
+                time.monotonic() + ttl if ttl else None
+            )
+            self._data[key] = (expires_at, str(value).encode())
+            return value
+
+
+class RedisBackend(SharedBackend):
+    """Redis-backed shared state (requires the optional redis package)"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        self._redis = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            await self._redis.set(key, value, px=int(ttl * 1000))
+        else:
+            await self._redis.set(key, value)
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        value = await self._redis.incrby(key, amount)
+        if ttl and value == amount:
+            await self._redis.pexpire(key, int(ttl * 1000))
+        return value
+
+    async def close(self):
+        await self._redis.close()
+
+
+_backend: Optional[SharedBackend] = None
+_backend_resolved = False
+
+
+def get_shared_backend() -> Optional[SharedBackend]:
+    """Get the configured shared backend, or None when state is process-local"""
+    global _backend, _backend_resolved
+    if not _backend_resolved:
+        _backend_resolved = True
+        try:
+            if SHARED_STATE_URL.startswith("memory://"):
+                _backend = InMemoryBackend()
+            elif SHARED_STATE_URL.startswith(("redis://", "rediss://")):
+                _backend = RedisBackend(SHARED_STATE_URL)
+            if _backend is not None:
+                logger.info(f"Shared state backend: {_backend.name}")
+        except ImportError as e:
+            logger.warning(f"Shared state backend unavailable, using process-local state: {e}")
+            _backend = None
+        except Exception as e:
+            logger.error(f"Failed to initialize shared state backend: {e}")
+            _backend = None
+    return _backend
@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Tracing settings; the endpoint follows the standard OpenTelemetry variable
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE")
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true" if (OTLP_ENDPOINT or TRACE_EXPORT_FILE) else "false").lower() == "true"
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "5"))
+TRACE_MAX_QUEUED_SPANS = int(os.getenv("TRACE_MAX_QUEUED_SPANS", "20000"))
+TRACE_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "morvo-backend")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("morvo_current_span", default=None)
+
+
+class Span:
+    """One timed operation; children share the trace id of the request that started it"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stand-in for unsampled or disabled tracing so call sites never branch"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class SpanExporter:
+    """Buffers finished spans and ships them in OTLP/JSON batches.
+
+    Spans go to an OTLP/HTTP collector, to a file of one export request per
+    line, or both. The buffer is bounded; spans are dropped when it is full.
+    """
+
+    def __init__(self, endpoint: Optional[str] = OTLP_ENDPOINT, path: Optional[str] = TRACE_EXPORT_FILE):
+        self.endpoint = endpoint.rstrip("/") + "/v1/traces" if endpoint else None
+        self.path = path
+        self.spans: Deque[Span] = deque(maxlen=TRACE_MAX_QUEUED_SPANS)
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self.exported = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def add(self, span: Span):
+        if len(self.spans) == self.spans.maxlen:
+            self.dropped += 1
+        self.spans.append(span)
+
+    def payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", TRACE_SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "morvo_python.app.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+
+    async def flush(self):
+        if not self.spans:
+            return
+        spans = list(self.spans)
+        self.spans.clear()
+        body = json.dumps(self.payload(spans), separators=(",", ":"))
+        try:
+            if self.path:
+                await asyncio.to_thread(self._append, body)
+            if self.endpoint:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(timeout=5.0)
+                response = await self._client.post(
+                    self.endpoint, content=body, headers={"Content-Type": "application/json"}
+                )
+                response.raise_for_status()
+            self.exported += len(spans)
+        except Exception as e:
+            self.failures += 1
+            self.dropped += len(spans)
+            logger.error(f"Span export failed: {e}")
+
+    def _append(self, body: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(body + "\n")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(TRACE_EXPORT_INTERVAL)
+            await self.flush()
+
+    def start(self):
+        if TRACING_ENABLED and (self.endpoint or self.path) and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Span export started ({self.endpoint or self.path})")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": TRACING_ENABLED,
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "queued": len(self.spans),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "export_failures": self.failures,
+        }
+
+
+span_exporter = SpanExporter()
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+    """Time a block as a child of the current span.
+
+    Outside any span a new trace is started, subject to TRACE_SAMPLE_RATE.
+    """
+    if not TRACING_ENABLED:
+        yield NOOP_SPAN
+        return
+    parent = _current_span.get()
+    if parent is NOOP_SPAN:
+        yield NOOP_SPAN
+        return
+    if parent is None:
+        if random.random() >= TRACE_SAMPLE_RATE:
+            yield NOOP_SPAN
+            return
+        current = Span(name, f"{random.getrandbits(128):032x}", None, kind, attributes)
+    else:
+        current = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        span_exporter.add(current)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per request, honouring incoming traceparent headers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < TRACE_SAMPLE_RATE
+        if not sampled:
+            token = _current_span.set(NOOP_SPAN)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _current_span.reset(token)
+            return
+
+        root = Span(f"{scope.get('method')} {scope.get('path')}", trace_id, parent_id, SPAN_KIND_SERVER, {
+            "http.method": scope.get("method"),
+            "http.target": scope.get("path"),
+        })
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope.get('method')} {route}"
+                root.set_attribute("http.route", route)
+            root.set_attribute("http.status_code", status[0])
+            if status[0] >= 500 and not root.error:
+                root.error = f"HTTP {status[0]}"
+            root.end_ns = time.time_ns()
+            span_exporter.add(root)
@@ -23,12 +23,9 @@ def test_imports():
         import uvicorn
         logger.info(f"Uvicorn version: {uvicorn.__version__}")
         
-        # Test optional imports
-        try:
-            from supabase import create_client
-            logger.info("Supabase import successful")
-        except ImportError as e:
-            logger.warning(f"Supabase import failed: {e}")
+        # Supabase is reached through its REST API with httpx
+        import httpx
+        logger.info(f"httpx version: {httpx.__version__}")
         
         return True
     except ImportError as e: